@@ -1,26 +1,849 @@
-import argparse
+import contextlib
+import json
+import os
+import queue
+import signal
 import socket
+import stat
+import sys
+import threading
+import time
+from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, HTTPServer
 
+from hello_world import accesslog, cache, httpparse, metrics, payload, profiling, stats
+
 
 class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Seconds an idle keep-alive connection is held open.
+    timeout = 5
+    # Requests served on one connection before it is closed (0: unlimited).
+    max_requests = 100
+    response_cache = cache.response_cache
+    # None logs through BaseHTTPRequestHandler (synchronously to stderr),
+    # False disables logging, otherwise an accesslog.AccessLog.
+    access_log = None
+    metrics = metrics.registry
+    stats = stats.traffic
+    # Parse plainly well-formed requests with httpparse instead of the email
+    # package; anything unusual still goes through the stdlib parser.
+    fast_parser = False
+    # Send phase durations as a Server-Timing header, and log the phases of
+    # requests slower than trace_slow_ms. With both off (timing False) no
+    # request takes extra timestamps.
+    server_timing = False
+    trace_slow_ms = 0
+    timing = False
+    # An ssl.SSLContext to terminate TLS with; the handshake runs on the
+    # thread serving the connection, not the accept loop.
+    ssl_context = None
+    # The server's set of idle connections while this one waits in it.
+    waiting_in = None
+
+    def setup(self):
+        if self.ssl_context is not None:
+            self.request = self.ssl_context.wrap_socket(
+                self.request, server_side=True, do_handshake_on_connect=False
+            )
+        super().setup()
+        self.request_started = time.perf_counter()
+        if self.timing:
+            accepted_at = getattr(self.server, "accepted_at", None)
+            self.accept_wait = accepted_at and self.request_started - accepted_at()
+            self.timer = None
+        self.metrics.connection_opened()
+
+    def finish(self):
+        self.metrics.connection_closed()
+        super().finish()
+        if self.ssl_context is not None:
+            # wrap_socket() detached the socket the server will shut down.
+            self.server.shutdown_request(self.request)
+
+    def handle(self):
+        self.requests_served = 0
+        if self.ssl_context is not None:
+            try:
+                self.request.do_handshake()
+            except OSError:
+                return
+            self.metrics.tls_handshake(self.request.session_reused)
+        super().handle()
+
+    def handle_one_request(self):
+        idle = getattr(self.server, "idle", None)
+        if idle is not None and self.requests_served:
+            # Waiting for the next request of a keep-alive connection, which
+            # close_idle() cuts short once the server stops accepting.
+            self.waiting_in = idle
+            idle.add(self.connection)
+            if self.server.closing_idle:
+                self.end_wait()
+                self.close_connection = True
+                return
+        super().handle_one_request()
+        self.end_wait()
+        if self.timing and self.timer is not None:
+            self.timer.finish()
+            elapsed = self.timer.total()
+            if self.trace_slow_ms and elapsed * 1000 >= self.trace_slow_ms:
+                self.trace(
+                    f'slow request "{self.requestline}" {elapsed * 1000:.3f}ms: {self.timer}'
+                )
+            self.timer = None
+
+    def end_wait(self):
+        if self.waiting_in is not None:
+            self.waiting_in.discard(self.connection)
+            self.waiting_in = None
+
+    def parse_request(self):
+        self.request_started = time.perf_counter()
+        self.end_wait()
+        parsed = (self.fast_parser and self.parse_request_fast()) or super().parse_request()
+        if self.timing:
+            accept = [("accept", self.accept_wait)] if self.accept_wait else []
+            self.accept_wait = None
+            self.timer = profiling.RequestTimer(self.request_started, accept)
+            self.timer.end("parse")
+        return parsed
+
+    def parse_request_fast(self):
+        """Parse the request from the read buffer; return False to leave it to the stdlib."""
+        request = httpparse.parse_request_line(self.raw_requestline)
+        if request is None:
+            return False
+        # peek() returns what is already buffered without consuming it, so a
+        # header block that is incomplete or unusual is still there to reparse.
+        parsed = httpparse.parse_header_block(self.rfile.peek(httpparse.MAX_HEADER_BLOCK))
+        if parsed is None:
+            return False
+        headers, length = parsed
+        if "expect" in headers:
+            return False
+        self.rfile.read(length)
+        self.command, self.path, self.request_version = request
+        self.requestline = self.raw_requestline[:-2].decode("iso-8859-1")
+        self.headers = headers
+        connection = headers.get("connection", "").lower()
+        if connection == "close":
+            self.close_connection = True
+        elif connection == "keep-alive" or self.request_version == "HTTP/1.1":
+            self.close_connection = self.protocol_version < "HTTP/1.1"
+        else:
+            self.close_connection = True
+        return True
+
     def do_GET(self):
-        self.send_response(200)
-        self.send_header("Content-Type", "text/plain")
+        self.requests_served += 1
+        if self.requests_served == self.max_requests:
+            self.close_connection = True
+        if self.path == "/healthz":
+            self.send_body(b"ok\n")
+            return
+        if self.path == "/readyz":
+            if self.ready():
+                self.send_body(b"ready\n")
+            else:
+                self.send_body(b"not ready\n", status=HTTPStatus.SERVICE_UNAVAILABLE)
+            return
+        if self.path == "/metrics":
+            self.send_body(self.metrics.render().encode(), metrics.CONTENT_TYPE)
+            return
+        if self.path == "/stats":
+            self.send_body(json.dumps(self.stats.snapshot()).encode(), "application/json")
+            return
+        if self.path.startswith(payload.PREFIXES):
+            self.send_payload()
+            return
+        self.send_hello()
+
+    def send_hello(self):
+        response = self.response_cache.get(keep_alive=self.keep_alive())
+        if self.timing and (server_timing := self.end_handle()):
+            response = cache.add_header(response, "Server-Timing", server_timing)
+        self.wfile.write(response)
+        self.log_request(200, self.response_cache.content_length)
+
+    def send_payload(self):
+        try:
+            kind, amount, chunk = payload.parse(self.path)
+        except ValueError as error:
+            self.send_error(HTTPStatus.BAD_REQUEST, str(error))
+            return
+        if kind == "delay":
+            time.sleep(amount / 1000)
+            self.send_hello()
+            return
+        chunked = chunk is not None and self.request_version != "HTTP/1.0"
+        keep_alive = self.keep_alive()
+        self.send_response_only(HTTPStatus.OK)
+        if self.timing and (server_timing := self.end_handle()):
+            self.send_header("Server-Timing", server_timing)
+        self.send_header("Content-Type", payload.CONTENT_TYPE)
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.send_header("Content-Length", str(amount))
+        if not keep_alive:
+            self.send_header("Connection", "close")
         self.end_headers()
-        hostname = socket.gethostname()
-        self.wfile.write(f"hello-world from {hostname}\n".encode())
+        if chunked:
+            payload.buffer().send_chunked(self.connection, amount, chunk)
+        else:
+            payload.buffer().send(self.connection, amount)
+        self.log_request(HTTPStatus.OK, amount)
 
+    def ready(self):
+        if getattr(self.server, "draining", False):
+            return False
+        ready = getattr(self.server, "ready", None)
+        return ready is None or ready()
+
+    def keep_alive(self):
+        """Whether the connection stays open after the response about to be written.
+
+        Checked as the response is written rather than when the request
+        arrives, so a request still running when draining starts is answered
+        with Connection: close too. With a worker pool the connection is also
+        closed while others are queued, so a busy keep-alive client cannot hold
+        its worker and a queued connection waits for one response at most.
+        """
+        queued = getattr(self.server, "queued", None)
+        if getattr(self.server, "draining", False) or (queued is not None and queued()):
+            self.close_connection = True
+        return not self.close_connection
+
+    def send_body(self, body, content_type="text/plain", status=HTTPStatus.OK):
+        self.log_request(status, len(body))
+        keep_alive = self.keep_alive()
+        self.send_response_only(status)
+        if self.timing and (server_timing := self.end_handle()):
+            self.send_header("Server-Timing", server_timing)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if not keep_alive:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def end_handle(self):
+        """End the handle phase; return the Server-Timing header value, or None."""
+        self.timer.end("handle")
+        return self.timer.server_timing() if self.server_timing else None
+
+    def trace(self, text):
+        if self.access_log is False:
+            print(text, file=sys.stderr, flush=True)
+        else:
+            self.log_message("%s", text)
+
+    def log_request(self, code="-", size="-"):
+        elapsed = time.perf_counter() - self.request_started
+        self.metrics.observe(int(code), elapsed, size if isinstance(size, int) else 0)
+        headers = getattr(self, "headers", None) or {}
+        self.stats.record(
+            self.address_string(), headers.get("X-Forwarded-For"), getattr(self, "path", None)
+        )
+        if self.access_log is None:
+            super().log_request(code, size)
+        elif self.access_log:
+            self.access_log.log(
+                self.address_string(),
+                self.requestline,
+                code,
+                size,
+                headers.get("Referer"),
+                headers.get("User-Agent"),
+            )
+
+    def address_string(self):
+        # Peers of a Unix domain socket have no address.
+        return self.client_address[0] if self.client_address else "-"
+
+    def log_message(self, format, *args):
+        if self.access_log is None:
+            super().log_message(format, *args)
+        elif self.access_log:
+            self.access_log.message(f"{self.address_string()} {format % args}")
+
+
+# Signals serve() handles. main() blocks them until serve() has installed its
+# handlers, so one sent while the server starts waits instead of killing it.
+SERVE_SIGNALS = (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGUSR1)
+
+PROBE_RESPONSES = {
+    b"GET /healthz ": cache.build_response(HTTPStatus.OK, b"ok\n", keep_alive=False),
+    b"GET /readyz ": cache.build_response(HTTPStatus.OK, b"ready\n", keep_alive=False),
+}
+NOT_READY_RESPONSE = cache.build_response(
+    HTTPStatus.SERVICE_UNAVAILABLE, b"not ready\n", keep_alive=False
+)
+
+
+class PoolingMixIn:
+    """Serve connections from a fixed pool of worker threads.
+
+    Accepted connections wait in a bounded queue rather than each getting a
+    thread of its own as with ThreadingMixIn. The accept loop never blocks:
+    once the queue is full, further connections are answered 503 with
+    Retry-After on the accept thread, as are connections beyond
+    ``max_inflight`` queued or being served when that is set.
+
+    While connections are queued, the accept thread answers /healthz and
+    /readyz probes itself, so kubelet sees a busy pod rather than a dead one.
+    ``ready()`` turns false once ``ready_max_inflight`` connections are
+    queued or being served.
+
+    The accept thread never does a TLS handshake, so with the handler's
+    ``ssl_context`` set it does not answer probes, and shed connections are
+    closed without a response.
+    """
+
+    workers = 8
+    queue_size = None
+    ready_max_inflight = None
+    max_inflight = 0
+    request_queue_size = 1024
+    block_on_close = True
+    draining = False
+
+    def __init__(
+        self,
+        *args,
+        workers=None,
+        queue_size=None,
+        ready_max_inflight=None,
+        max_inflight=None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        if max_inflight is not None:
+            self.max_inflight = max_inflight
+        if workers is not None:
+            self.workers = workers
+        if queue_size is not None:
+            self.queue_size = queue_size
+        queue_size = self.queue_size or 4 * self.workers
+        if ready_max_inflight is not None:
+            self.ready_max_inflight = ready_max_inflight
+        elif self.ready_max_inflight is None:
+            self.ready_max_inflight = self.workers + queue_size // 2
+        self._queue_limit = queue_size
+        # Room beyond the limit for one stop sentinel per worker, so drain()
+        # and server_close() never wait for a worker to free a slot.
+        self._requests = queue.Queue(queue_size + self.workers)
+        self._busy = [False] * self.workers
+        # Connections whose worker waits for their next request, closed by
+        # close_idle() once the server stops accepting.
+        self.idle = set()
+        self.closing_idle = False
+        self._local = threading.local()
+        self._threads = [
+            threading.Thread(target=self._process_requests, args=(index,), daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def server_activate(self):
+        if self.socket.family != socket.AF_UNIX and hasattr(socket, "TCP_DEFER_ACCEPT"):
+            # Accept connections only once their request has arrived, so a
+            # worker never waits on a silent client and probes can be peeked.
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_DEFER_ACCEPT, 1)
+        super().server_activate()
+
+    def queued(self):
+        return self._requests.qsize()
+
+    def inflight(self):
+        return self._requests.qsize() + sum(self._busy)
+
+    def ready(self):
+        if self.draining:
+            return False
+        return not self.ready_max_inflight or self.inflight() < self.ready_max_inflight
+
+    def process_request(self, request, client_address):
+        queued = self._requests.qsize()
+        tls = getattr(self.RequestHandlerClass, "ssl_context", None) is not None
+        if queued and not tls and self._answer_probe(request):
+            self.shutdown_request(request)
+        elif queued >= self._queue_limit or (
+            self.max_inflight and queued + sum(self._busy) >= self.max_inflight
+        ):
+            self._reject(request, tls)
+            self.shutdown_request(request)
+        else:
+            self._requests.put_nowait((request, client_address, time.perf_counter()))
+
+    def _reject(self, request, tls=False):
+        try:
+            # Read whatever part of the request has arrived so closing the
+            # socket does not reset it before the client sees the 503.
+            request.recv(65536, socket.MSG_DONTWAIT)
+        except OSError:
+            pass
+        if not tls:
+            # A TLS client would take the plaintext 503 for a broken handshake;
+            # it is closed instead, still counted as a 503 below.
+            try:
+                request.sendall(cache.OVERLOADED_RESPONSE)
+            except OSError:
+                pass
+        registry = getattr(self.RequestHandlerClass, "metrics", None)
+        if registry is not None:
+            registry.observe(HTTPStatus.SERVICE_UNAVAILABLE, 0.0, len(cache.OVERLOADED_BODY))
+
+    def _answer_probe(self, request):
+        try:
+            head = request.recv(1024, socket.MSG_PEEK | socket.MSG_DONTWAIT)
+        except OSError:
+            return False
+        for prefix, response in PROBE_RESPONSES.items():
+            if head.startswith(prefix):
+                break
+        else:
+            return False
+        end = head.find(b"\r\n\r\n")
+        if end < 0:
+            return False
+        if prefix == b"GET /readyz " and not self.ready():
+            response = NOT_READY_RESPONSE
+        try:
+            # Consume the request so closing the socket does not reset it.
+            request.recv(end + 4)
+            request.sendall(response)
+        except OSError:
+            pass
+        return True
+
+    def _process_requests(self, index):
+        while (item := self._requests.get()) is not None:
+            request, client_address, self._local.accepted_at = item
+            self._busy[index] = True
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                self._busy[index] = False
+
+    def close_idle(self):
+        """Close keep-alive connections waiting for another request; call once draining."""
+        self.closing_idle = True
+        for request in self.idle.copy():
+            with contextlib.suppress(OSError):
+                # Wakes the worker blocked reading the next request line, which
+                # then closes the connection. socket.shutdown() directly, since
+                # SSLSocket.shutdown() would also drop the TLS state under it.
+                socket.socket.shutdown(request, socket.SHUT_RD)
+
+    def accepted_at(self):
+        """Return when the connection this worker thread is serving was accepted."""
+        return self._local.accepted_at
+
+    def drain(self, timeout):
+        """Let workers finish queued and open connections; call after serve_forever().
+
+        Returns False if some were still being served after ``timeout`` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        self.socket.close()
+        for _ in self._threads:
+            self._requests.put_nowait(None)
+        for thread in self._threads:
+            thread.join(max(0, deadline - time.monotonic()))
+        drained = not any(thread.is_alive() for thread in self._threads)
+        self._threads = []
+        return drained
+
+    def server_close(self):
+        super().server_close()
+        for _ in self._threads:
+            self._requests.put_nowait(None)
+        if self.block_on_close:
+            for thread in self._threads:
+                thread.join()
+
+
+class PooledHTTPServer(PoolingMixIn, HTTPServer):
+    pass
+
+
+def open_listener(args):
+    """Return the socket for --unix or --fd, or None to bind --bind and --port.
+
+    The socket is created once, before any worker process is forked, so all
+    workers accept from the same queue.
+    """
+    if args.fd is not None:
+        sock = socket.socket(fileno=args.fd)
+        if sock.type != socket.SOCK_STREAM:
+            sock.detach()
+            raise OSError(f"file descriptor {args.fd} is not a stream socket")
+        return sock
+    if args.unix is not None:
+        with contextlib.suppress(FileNotFoundError):
+            # A socket file left behind by a previous run would fail the bind.
+            if stat.S_ISSOCK(os.stat(args.unix).st_mode):
+                os.unlink(args.unix)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(args.unix)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+    return None
+
+
+def describe_listener(args):
+    if args.fd is not None:
+        return f"fd {args.fd}"
+    if args.unix is not None:
+        return f"unix:{args.unix}"
+    scheme = "https" if args.tls_cert else "http"
+    return f"{scheme}://{args.bind}:{args.port}"
+
+
+def make_server(args, reuse_port=False, sock=None, ssl_context=None):
+    """Build the server for ``args``, binding --bind/--port unless ``sock`` is given.
+
+    With --tls-cert the server uses ``ssl_context``, or a new one if none is given.
+    """
+    if args.tls_cert and ssl_context is None:
+        from hello_world import tls
+
+        ssl_context = tls.server_context(args.tls_cert, args.tls_key)
+    access_log = accesslog.open_access_log(
+        args.access_log, args.access_log_format, args.access_log_sample
+    )
+    if args.engine != "stdlib":
+        if args.engine == "compact":
+            from hello_world.compact import CompactServer as server_class
+        else:
+            from hello_world.aio import AsyncioServer as server_class
+
+        return server_class(
+            (args.bind, args.port),
+            reuse_port=reuse_port,
+            keepalive_timeout=args.keepalive_timeout,
+            max_requests=args.max_requests,
+            access_log=access_log,
+            ready_max_inflight=args.ready_max_inflight or 0,
+            max_inflight=args.max_inflight,
+            backlog=args.backlog,
+            drain_timeout=args.drain_timeout,
+            sock=sock,
+            server_timing=args.server_timing,
+            trace_slow_ms=args.trace_slow_ms,
+            ssl_context=ssl_context,
+        )
+    # Without worker threads an idle keep-alive connection would stall the
+    # accept loop, so the serial server answers one request per connection.
+    handler = type(
+        "Handler",
+        (Handler,),
+        {
+            "timeout": args.keepalive_timeout,
+            "max_requests": args.max_requests if args.workers else 1,
+            "access_log": access_log,
+            "fast_parser": args.parser == "fast",
+            "server_timing": args.server_timing,
+            "trace_slow_ms": args.trace_slow_ms,
+            "timing": bool(args.server_timing or args.trace_slow_ms),
+            "ssl_context": ssl_context,
+        },
+    )
+    if args.workers:
+        server = PooledHTTPServer(
+            (args.bind, args.port),
+            handler,
+            bind_and_activate=False,
+            workers=args.workers,
+            queue_size=args.queue_size,
+            ready_max_inflight=args.ready_max_inflight,
+            max_inflight=args.max_inflight,
+        )
+    else:
+        server = HTTPServer((args.bind, args.port), handler, bind_and_activate=False)
+    server.allow_reuse_port = reuse_port
+    server.request_queue_size = args.backlog
+    server.access_log = access_log
+    try:
+        if sock is None:
+            server.server_bind()
+        else:
+            server.socket.close()
+            server.socket = sock
+            server.server_address = sock.getsockname()
+        server.server_activate()
+    except BaseException:
+        server.server_close()
+        raise
+    return server
+
+
+def serve(server, shutdown_delay=0, drain_timeout=25, sampler=None):
+    """Serve until SIGTERM, then drain.
+
+    On SIGTERM the server reports not ready and closes connections after
+    their next response, keeps accepting for ``shutdown_delay`` seconds while
+    load balancers catch up, then stops accepting, closes keep-alive
+    connections waiting for another request and gives in-flight and
+    queued requests up to ``drain_timeout`` seconds to finish. SIGUSR1 starts
+    ``sampler``, a profiling.Sampler. SERVE_SIGNALS are unblocked once the
+    handlers are installed.
+    """
+
+    def stop():
+        server.draining = True
+        time.sleep(shutdown_delay)
+        close_idle = getattr(server, "close_idle", None)
+        if close_idle is not None:
+            close_idle()
+        server.shutdown()
+
+    signal.signal(
+        signal.SIGTERM, lambda signum, frame: threading.Thread(target=stop, daemon=True).start()
+    )
+    signal.signal(signal.SIGHUP, lambda signum, frame: cache.response_cache.refresh())
+    if sampler is not None:
+        signal.signal(signal.SIGUSR1, lambda signum, frame: sampler.start())
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, SERVE_SIGNALS)
+    server.serve_forever()
+    drain = getattr(server, "drain", None)
+    if drain is not None and not drain(drain_timeout):
+        print(f"Drain timed out after {drain_timeout}s; closing remaining connections", flush=True)
+    server.server_close()
+    if server.access_log:
+        server.access_log.close()
+
+
+def build_parser():
+    # Imported here so that importing the package without the CLI does not pay for it.
+    import argparse
 
-def main():
     parser = argparse.ArgumentParser(description="Simple hello-world web server")
     parser.add_argument("-b", "--bind", default="0.0.0.0", help="Bind address (default: 0.0.0.0)")
     parser.add_argument("-p", "--port", type=int, default=49000, help="Port (default: 49000)")
+    listener = parser.add_mutually_exclusive_group()
+    listener.add_argument(
+        "--unix", metavar="PATH", help="Listen on a Unix domain socket instead of --bind/--port"
+    )
+    listener.add_argument(
+        "--fd",
+        type=int,
+        metavar="N",
+        help="Serve an inherited, already bound socket, e.g. from systemd socket activation "
+        "(LISTEN_FDS starts at 3)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["stdlib", "asyncio", "compact"],
+        default="stdlib",
+        help="Serving engine: http.server handler, asyncio event loop, or an asyncio protocol "
+        "that keeps the least memory per open connection (default: stdlib)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=0,
+        help="Worker threads serving connections (default: 0, serve on the accept thread)",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        help="Connections queued for busy workers; further ones are answered 503 "
+        "(default: 4 * workers)",
+    )
+    parser.add_argument(
+        "--backlog",
+        type=int,
+        default=1024,
+        help="Listen backlog, capped by net.core.somaxconn (default: 1024)",
+    )
+    parser.add_argument(
+        "--max-inflight",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Answer 503 with Retry-After once N connections are queued or being served with "
+        "--workers, or N requests are in progress with --engine asyncio/compact "
+        "(default: 0, unlimited)",
+    )
+    parser.add_argument(
+        "--ready-max-inflight",
+        type=int,
+        metavar="N",
+        help="Report /readyz not ready once N connections are queued or being served with "
+        "--workers, or N requests are in progress with --engine asyncio/compact "
+        "(default: workers + queue size / 2 with --workers, otherwise disabled)",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=["stdlib", "fast"],
+        default="stdlib",
+        help="Request parser of the stdlib engine: http.client, or a strict fast path that "
+        "falls back to http.client for unusual requests (default: stdlib)",
+    )
+    parser.add_argument(
+        "--tls-cert",
+        metavar="PATH",
+        help="Serve HTTPS with this PEM certificate chain; it may also hold the key",
+    )
+    parser.add_argument(
+        "--tls-key", metavar="PATH", help="PEM private key for --tls-cert, if not in that file"
+    )
+    parser.add_argument(
+        "--keepalive-timeout",
+        type=float,
+        default=5,
+        help="Seconds an idle keep-alive connection is held open (default: 5)",
+    )
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=100,
+        help="Requests served per connection before closing it, 0 for unlimited (default: 100)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Worker processes sharing the port with SO_REUSEPORT (default: 1)",
+    )
+    parser.add_argument(
+        "--access-log",
+        default="stderr",
+        metavar="{off,stderr,PATH}",
+        help="Where buffered access log records are written (default: stderr)",
+    )
+    parser.add_argument(
+        "--access-log-format",
+        choices=accesslog.FORMATS,
+        default="combined",
+        help="Access log record format (default: combined)",
+    )
+    parser.add_argument(
+        "--access-log-sample",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Log one in N requests (default: 1, every request)",
+    )
+    parser.add_argument(
+        "--server-timing",
+        action="store_true",
+        help="Send accept, parse and handle durations in a Server-Timing response header",
+    )
+    parser.add_argument(
+        "--trace-slow-ms",
+        type=float,
+        default=0,
+        metavar="MS",
+        help="Log the phase durations of requests slower than MS milliseconds (default: 0, off)",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        metavar="DIR",
+        help="Where SIGUSR1 writes stack samples (default: the temporary directory)",
+    )
+    parser.add_argument(
+        "--profile-seconds",
+        type=float,
+        default=10,
+        help="Seconds of stack samples SIGUSR1 collects (default: 10)",
+    )
+    parser.add_argument(
+        "--shutdown-delay",
+        type=float,
+        default=0,
+        help="Seconds to keep accepting after SIGTERM while reporting not ready (default: 0)",
+    )
+    parser.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=25,
+        help="Seconds in-flight requests get to finish after accepting stops (default: 25)",
+    )
+    return parser
+
+
+def main():
+    from hello_world import cli
+
+    parser = build_parser()
+    cli.add_subcommands(parser)
     args = parser.parse_args()
+    if args.command == "bench":
+        from hello_world import bench
 
-    server = HTTPServer((args.bind, args.port), Handler)
-    print(f"Server running on http://{args.bind}:{args.port}")
-    server.serve_forever()
+        bench.main(args)
+        return
+    if args.command == "probe":
+        from hello_world import probe
+
+        try:
+            probe.main(args)
+        except ValueError as error:
+            parser.error(str(error))
+        return
+    if args.engine != "stdlib" and args.workers:
+        parser.error("--workers requires --engine stdlib")
+    if args.engine == "stdlib" and not args.workers:
+        # The serial server has no queue to measure, so these would be ignored.
+        if args.max_inflight:
+            parser.error("--max-inflight requires --workers or --engine asyncio/compact")
+        if args.ready_max_inflight is not None:
+            parser.error("--ready-max-inflight requires --workers or --engine asyncio/compact")
+    ssl_context = None
+    if args.tls_key and not args.tls_cert:
+        parser.error("--tls-key requires --tls-cert")
+    if args.tls_cert:
+        from hello_world import tls
+
+        try:
+            # Created before --processes forks so that every worker shares
+            # its session ticket keys.
+            ssl_context = tls.server_context(args.tls_cert, args.tls_key)
+        except (OSError, ValueError) as error:
+            parser.error(f"cannot load --tls-cert: {error}")
+
+    sampler = profiling.Sampler(args.profile_dir, args.profile_seconds)
+    signal.pthread_sigmask(signal.SIG_BLOCK, SERVE_SIGNALS)
+    try:
+        listener = open_listener(args)
+    except OSError as error:
+        parser.error(f"cannot listen on {describe_listener(args)}: {error}")
+    try:
+        if args.processes > 1:
+            from hello_world.prefork import Supervisor
+
+            def worker(index):
+                metrics.registry.claim(index)
+                stats.traffic.claim(index)
+                server = make_server(
+                    args, reuse_port=listener is None, sock=listener, ssl_context=ssl_context
+                )
+                serve(server, args.shutdown_delay, args.drain_timeout, sampler)
+
+            metrics.registry.share(args.processes)
+            stats.traffic.share(args.processes)
+            print(f"Server running on {describe_listener(args)}", flush=True)
+            Supervisor(worker, args.processes).run()
+        else:
+            server = make_server(args, sock=listener, ssl_context=ssl_context)
+            print(f"Server running on {describe_listener(args)}", flush=True)
+            serve(server, args.shutdown_delay, args.drain_timeout, sampler)
+    finally:
+        if args.unix is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(args.unix)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,3 @@
+from hello_world import main
+
+main()
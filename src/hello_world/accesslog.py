@@ -0,0 +1,121 @@
+import collections
+import itertools
+import json
+import sys
+import threading
+import time
+
+FORMATS = ("combined", "json")
+
+
+class AccessLog:
+    """Access log that never blocks the request path on I/O.
+
+    ``log()`` only appends a tuple to an in-memory ring buffer; a daemon
+    thread formats and writes the buffered records every ``flush_interval``
+    seconds. When the writer falls behind, the oldest records are dropped and
+    counted instead of stalling requests. With ``sample`` set to N only one
+    in N requests is recorded.
+    """
+
+    def __init__(
+        self,
+        stream,
+        format="combined",
+        sample=1,
+        capacity=8192,
+        flush_interval=1.0,
+        close_stream=False,
+    ):
+        if format not in FORMATS:
+            raise ValueError(f"unknown access log format: {format!r}")
+        self.stream = stream
+        self.format = format
+        self.sample = sample
+        self.flush_interval = flush_interval
+        self.close_stream = close_stream
+        self.dropped = 0
+        self._buffer = collections.deque(maxlen=capacity)
+        self._counter = itertools.count()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def log(self, client, request_line, status, size, referer=None, user_agent=None):
+        if self.sample > 1 and next(self._counter) % self.sample:
+            return
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append((time.time(), client, request_line, status, size, referer, user_agent))
+
+    def message(self, text):
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append((time.time(), text))
+
+    def flush(self):
+        lines = []
+        while self._buffer:
+            record = self._buffer.popleft()
+            lines.append(self._format_record(record))
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            lines.append(self._format_record((time.time(), f"dropped {dropped} log records")))
+        if lines:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+
+    def close(self):
+        self._closed.set()
+        self._thread.join()
+        self.flush()
+        if self.close_stream:
+            self.stream.close()
+
+    def _run(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+    def _format_record(self, record):
+        if len(record) == 2:
+            timestamp, text = record
+            if self.format == "json":
+                return json.dumps({"time": _iso_time(timestamp), "message": text})
+            return f"[{_clf_time(timestamp)}] {text}"
+        timestamp, client, request_line, status, size, referer, user_agent = record
+        if self.format == "json":
+            return json.dumps(
+                {
+                    "time": _iso_time(timestamp),
+                    "remote_addr": client,
+                    "request": request_line,
+                    "status": status,
+                    "size": size,
+                    "referer": referer,
+                    "user_agent": user_agent,
+                }
+            )
+        return (
+            f'{client} - - [{_clf_time(timestamp)}] "{request_line}" {status} {size} '
+            f'"{referer or "-"}" "{user_agent or "-"}"'
+        )
+
+
+def _clf_time(timestamp):
+    return time.strftime("%d/%b/%Y:%H:%M:%S +0000", time.gmtime(timestamp))
+
+
+def _iso_time(timestamp):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+
+def open_access_log(target, format="combined", sample=1):
+    """Return an AccessLog for ``target`` ("stderr" or a file path), or False for "off"."""
+    if target == "off":
+        return False
+    if target == "stderr":
+        return AccessLog(sys.stderr, format, sample)
+    return AccessLog(open(target, "a", encoding="utf-8"), format, sample, close_stream=True)
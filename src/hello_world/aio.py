@@ -0,0 +1,374 @@
+import asyncio
+import contextlib
+import json
+import socket
+import sys
+import threading
+import time
+from http import HTTPStatus
+
+from hello_world import cache, metrics, payload, profiling, stats
+
+MAX_LINE = 65536
+MAX_HEADERS = 100
+BAD_REQUEST_BODY = b"Bad request\n"
+
+
+class BadRequest(Exception):
+    pass
+
+
+def set_nodelay(transport):
+    """Disable Nagle's algorithm on the socket of ``transport``.
+
+    asyncio only does so for sockets created with proto IPPROTO_TCP, which
+    sockets from socket.create_server() or an inherited --fd are not. Without
+    it, a response written after TLS session tickets waits for a delayed ACK.
+    """
+    sock = transport.get_extra_info("socket")
+    if sock.family in (socket.AF_INET, socket.AF_INET6):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class AsyncioServer:
+    """Serve the hello-world response from a single asyncio event loop.
+
+    Mirrors the parts of the socketserver API that main() and the tests use:
+    ``serve_forever()``, ``shutdown()``, ``server_close()`` and
+    ``server_address``. Connections are HTTP/1.1 keep-alive by default, so an
+    idle client costs a parked coroutine instead of a blocked thread.
+    """
+
+    def __init__(
+        self,
+        server_address,
+        reuse_port=False,
+        keepalive_timeout=5,
+        max_requests=100,
+        access_log=False,
+        metrics=metrics.registry,
+        stats=stats.traffic,
+        ready_max_inflight=0,
+        max_inflight=0,
+        backlog=1024,
+        drain_timeout=0,
+        sock=None,
+        server_timing=False,
+        trace_slow_ms=0,
+        ssl_context=None,
+    ):
+        self.keepalive_timeout = keepalive_timeout
+        self.max_requests = max_requests
+        self.access_log = access_log
+        self.metrics = metrics
+        self.stats = stats
+        self.ready_max_inflight = ready_max_inflight
+        self.max_inflight = max_inflight
+        self.backlog = backlog
+        self.drain_timeout = drain_timeout
+        self.server_timing = server_timing
+        self.trace_slow_ms = trace_slow_ms
+        self.timing = bool(server_timing or trace_slow_ms)
+        self.ssl_context = ssl_context
+        self.draining = False
+        self.connections = 0
+        # Payload requests waiting or being written. Every other request is
+        # answered as soon as it is parsed, without yielding to the loop, so
+        # it never overlaps another; idle keep-alive connections do not count.
+        self._inflight = 0
+        # Writers of keep-alive connections waiting for their next request,
+        # closed by close_idle() once the server stops accepting.
+        self._idle = set()
+        self._closing_idle = False
+        if sock is None:
+            sock = socket.create_server(server_address, backlog=backlog, reuse_port=reuse_port)
+        else:
+            sock.listen(backlog)
+        self.socket = sock
+        self.server_address = self.socket.getsockname()
+        self._started = threading.Event()
+        self._stopped = threading.Event()
+
+    def serve_forever(self):
+        self._stopped.clear()
+        try:
+            asyncio.run(self._serve())
+        finally:
+            self._stopped.set()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        server = await self._start_server()
+        self._started.set()
+        try:
+            await self._stop.wait()
+        finally:
+            self._started.clear()
+            server.close()
+            try:
+                # Open connections end after their next response or when idle.
+                async with asyncio.timeout(self.drain_timeout):
+                    await server.wait_closed()
+            except TimeoutError:
+                server.close_clients()
+                await server.wait_closed()
+
+    async def _start_server(self):
+        # start_server() listens again with its own backlog (100) unless given one.
+        return await asyncio.start_server(
+            self._handle,
+            sock=self.socket,
+            limit=MAX_LINE,
+            backlog=self.backlog,
+            **self._tls_options(),
+        )
+
+    def _tls_options(self):
+        if self.ssl_context is None:
+            return {}
+        return {"ssl": self.ssl_context, "ssl_handshake_timeout": self.keepalive_timeout}
+
+    def shutdown(self):
+        self._started.wait()
+        self._loop.call_soon_threadsafe(self._stop.set)
+        self._stopped.wait()
+
+    def server_close(self):
+        self.socket.close()
+
+    def close_idle(self):
+        """Close keep-alive connections waiting for another request; call once draining."""
+        if self._started.is_set():
+            with contextlib.suppress(RuntimeError):
+                self._loop.call_soon_threadsafe(self._close_idle)
+
+    def _close_idle(self):
+        self._closing_idle = True
+        for writer in self._idle:
+            # Nothing is left to send, and closing a TLS connection gracefully
+            # would wait for a close_notify that an idle client may never send.
+            writer.transport.abort()
+
+    def inflight(self):
+        return self._inflight
+
+    def overloaded(self):
+        """Whether a request arriving now is shed with --max-inflight."""
+        return self.max_inflight and self._inflight >= self.max_inflight
+
+    def ready(self):
+        if self.draining:
+            return False
+        return not self.ready_max_inflight or self._inflight < self.ready_max_inflight
+
+    async def _handle(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        # Peers of a Unix domain socket have no address.
+        client = peer[0] if peer else "-"
+        set_nodelay(writer.transport)
+        served = 0
+        self.connections += 1
+        self.metrics.connection_opened()
+        ssl_object = writer.get_extra_info("ssl_object")
+        if ssl_object is not None:
+            self.metrics.tls_handshake(ssl_object.session_reused)
+        try:
+            while True:
+                if served:
+                    if self._closing_idle:
+                        break
+                    self._idle.add(writer)
+                try:
+                    async with asyncio.timeout(self.keepalive_timeout):
+                        request_line = await reader.readline()
+                except TimeoutError:
+                    break
+                finally:
+                    self._idle.discard(writer)
+                if not request_line:
+                    break
+                started = time.perf_counter()
+                try:
+                    method, target, version, headers = await self._read_request(
+                        reader, request_line
+                    )
+                except BadRequest:
+                    status, size = HTTPStatus.BAD_REQUEST, len(BAD_REQUEST_BODY)
+                    self._respond(writer, status, BAD_REQUEST_BODY, False)
+                    self._log(client, request_line, {}, status, size, started)
+                    break
+                timer = None
+                if self.timing:
+                    timer = profiling.RequestTimer(started)
+                    timer.end("parse")
+                connection = headers.get("connection", "").lower()
+                if version == "HTTP/1.0":
+                    keep_alive = connection == "keep-alive"
+                else:
+                    keep_alive = connection != "close"
+                served += 1
+                if served == self.max_requests or self.draining:
+                    keep_alive = False
+                if self.overloaded():
+                    writer.write(cache.OVERLOADED_RESPONSE)
+                    await writer.drain()
+                    status, size = HTTPStatus.SERVICE_UNAVAILABLE, len(cache.OVERLOADED_BODY)
+                    self._log(client, request_line, headers, status, size, started)
+                    break
+                status, size, keep_alive = await self._dispatch(
+                    writer, method, target, version, keep_alive, timer
+                )
+                await writer.drain()
+                self._log(client, request_line, headers, status, size, started)
+                if timer is not None:
+                    self._trace(request_line, timer)
+                if not keep_alive or status == HTTPStatus.BAD_REQUEST:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self.connections -= 1
+            self.metrics.connection_closed()
+            writer.close()
+
+    async def _dispatch(self, writer, method, target, version, keep_alive, timer=None):
+        """Write the response for one request.
+
+        Returns (status, body size, whether the response kept the connection
+        open), which for a payload request is decided only once it is answered.
+        """
+        if method == "GET" and target.startswith(payload.PREFIXES):
+            try:
+                kind, amount, chunk = payload.parse(target)
+            except ValueError as error:
+                body = f"{error}\n".encode()
+                self._respond(writer, HTTPStatus.BAD_REQUEST, body, False, timer=timer)
+                return HTTPStatus.BAD_REQUEST, len(body), False
+            self._inflight += 1
+            try:
+                if kind == "delay":
+                    await asyncio.sleep(amount / 1000)
+                # Draining may have started while the request waited.
+                keep_alive = keep_alive and not self.draining
+                if kind == "delay":
+                    return *self._send_hello(writer, keep_alive, timer), keep_alive
+                await self._send_payload(writer, amount, chunk, version, keep_alive, timer)
+                return HTTPStatus.OK, amount, keep_alive
+            finally:
+                self._inflight -= 1
+        return *self._route(writer, method, target, keep_alive, timer), keep_alive
+
+    def _route(self, writer, method, target, keep_alive, timer=None):
+        """Answer a request that needs no waiting; payload endpoints are left to _dispatch."""
+        if method != "GET":
+            body = f"Unsupported method ({method!r})\n".encode()
+            self._respond(writer, HTTPStatus.NOT_IMPLEMENTED, body, keep_alive, timer=timer)
+            return HTTPStatus.NOT_IMPLEMENTED, len(body)
+        if target == "/healthz":
+            body = b"ok\n"
+            self._respond(writer, HTTPStatus.OK, body, keep_alive, timer=timer)
+            return HTTPStatus.OK, len(body)
+        if target == "/readyz":
+            if self.ready():
+                status, body = HTTPStatus.OK, b"ready\n"
+            else:
+                status, body = HTTPStatus.SERVICE_UNAVAILABLE, b"not ready\n"
+            self._respond(writer, status, body, keep_alive, timer=timer)
+            return status, len(body)
+        if target == "/metrics":
+            body = self.metrics.render().encode()
+            self._respond(writer, HTTPStatus.OK, body, keep_alive, metrics.CONTENT_TYPE, timer)
+            return HTTPStatus.OK, len(body)
+        if target == "/stats":
+            body = json.dumps(self.stats.snapshot()).encode()
+            self._respond(writer, HTTPStatus.OK, body, keep_alive, "application/json", timer)
+            return HTTPStatus.OK, len(body)
+        return self._send_hello(writer, keep_alive, timer)
+
+    def _send_hello(self, writer, keep_alive, timer=None):
+        response = cache.response_cache.get(keep_alive)
+        for name, value in self._end_handle(timer):
+            response = cache.add_header(response, name, value)
+        writer.write(response)
+        return HTTPStatus.OK, cache.response_cache.content_length
+
+    async def _send_payload(self, writer, amount, chunk, version, keep_alive, timer=None):
+        chunked = chunk is not None and version != "HTTP/1.0"
+        head = f"HTTP/1.1 200 OK\r\nContent-Type: {payload.CONTENT_TYPE}\r\n"
+        for name, value in self._end_handle(timer):
+            head += f"{name}: {value}\r\n"
+        if chunked:
+            head += "Transfer-Encoding: chunked\r\n"
+        else:
+            head += f"Content-Length: {amount}\r\n"
+        if not keep_alive:
+            head += "Connection: close\r\n"
+        writer.write(f"{head}\r\n".encode("latin-1"))
+        for piece in payload.buffer().slices(amount, chunk):
+            if chunked:
+                writer.writelines([b"%x\r\n" % len(piece), piece, b"\r\n"])
+            else:
+                writer.write(piece)
+            await writer.drain()
+        if chunked:
+            writer.write(b"0\r\n\r\n")
+
+    async def _read_request(self, reader, request_line):
+        words = request_line.decode("iso-8859-1").split()
+        if len(words) != 3 or not words[2].startswith("HTTP/1."):
+            raise BadRequest
+        headers = {}
+        for _ in range(MAX_HEADERS):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n"):
+                break
+            name, sep, value = line.decode("iso-8859-1").partition(":")
+            if not sep or not line.endswith(b"\n"):
+                raise BadRequest
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise BadRequest
+        length = headers.get("content-length", "0")
+        if not length.isdigit():
+            raise BadRequest
+        if int(length):
+            await reader.readexactly(int(length))
+        return words[0], words[1], words[2], headers
+
+    def _log(self, client, request_line, headers, status, size, started):
+        self.metrics.observe(status.value, time.perf_counter() - started, size)
+        words = request_line.split(b" ", 2)
+        path = words[1].decode("iso-8859-1") if len(words) == 3 else None
+        self.stats.record(client, headers.get("x-forwarded-for"), path)
+        if self.access_log:
+            self.access_log.log(
+                client,
+                request_line.decode("iso-8859-1").rstrip("\r\n"),
+                status.value,
+                size,
+                headers.get("referer"),
+                headers.get("user-agent"),
+            )
+
+    def _end_handle(self, timer):
+        """End the handle phase of ``timer``; return the extra response headers."""
+        if timer is None:
+            return ()
+        timer.end("handle")
+        return (("Server-Timing", timer.server_timing()),) if self.server_timing else ()
+
+    def _trace(self, request_line, timer):
+        timer.finish()
+        elapsed = timer.total() * 1000
+        if self.trace_slow_ms and elapsed >= self.trace_slow_ms:
+            request_line = request_line.decode("iso-8859-1").rstrip("\r\n")
+            text = f'slow request "{request_line}" {elapsed:.3f}ms: {timer}'
+            if self.access_log:
+                self.access_log.message(text)
+            else:
+                print(text, file=sys.stderr, flush=True)
+
+    def _respond(self, writer, status, body, keep_alive, content_type="text/plain", timer=None):
+        headers = self._end_handle(timer)
+        writer.write(cache.build_response(status, body, keep_alive, content_type, headers))
@@ -0,0 +1,258 @@
+import itertools
+import json
+import resource
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from hello_world.cli import DEFAULT_BENCH_CONFIGS, percentile
+
+REQUEST = b"GET / HTTP/1.1\r\nHost: bench\r\n\r\n"
+
+
+class Connection:
+    """Minimal HTTP/1.1 client connection; cheap enough to not be the bottleneck."""
+
+    def __init__(self, address, keep_alive=True, request=REQUEST, ssl_context=None, resume=True):
+        self.address = address
+        self.request = request if keep_alive else request[:-2] + b"Connection: close\r\n\r\n"
+        self.ssl_context = ssl_context
+        self.resume = resume
+        self.session = None
+        self.sock = None
+        self.buffer = b""
+
+    def get(self):
+        if self.sock is None:
+            self.sock = socket.create_connection(self.address, timeout=10)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.ssl_context is not None:
+                self.sock = self.ssl_context.wrap_socket(
+                    self.sock, server_hostname=self.address[0], session=self.session
+                )
+            self.buffer = b""
+        try:
+            self.sock.sendall(self.request)
+            while (end := self.buffer.find(b"\r\n\r\n")) < 0:
+                self._recv()
+            head = self.buffer[:end].decode("latin-1").lower()
+            status = int(head[9:12])
+            length = 0
+            close = False
+            for line in head.split("\r\n")[1:]:
+                name, _, value = line.partition(":")
+                if name == "content-length":
+                    length = int(value)
+                elif name == "connection":
+                    close = value.strip() == "close"
+            while len(self.buffer) < end + 4 + length:
+                self._recv()
+            body = self.buffer[end + 4 : end + 4 + length]
+            self.buffer = self.buffer[end + 4 + length :]
+        except BaseException:
+            self.close()
+            raise
+        if close:
+            self.close()
+        return status, body
+
+    def _recv(self):
+        chunk = self.sock.recv(65536)
+        if not chunk:
+            raise ConnectionError("connection closed mid-response")
+        self.buffer += chunk
+
+    def close(self):
+        if self.sock is not None:
+            if self.resume and self.ssl_context is not None:
+                self.session = self.sock.session
+            self.sock.close()
+            self.sock = None
+
+
+def rss_kb(pid):
+    """Resident set size of process ``pid``, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() // 1024
+    except OSError:
+        return None
+
+
+def run_load(
+    address, duration, concurrency, rate=None, keep_alive=True, ssl_context=None, resume=True
+):
+    """Drive ``address`` and return (latencies, errors, elapsed).
+
+    Closed loop (``rate`` unset): each of ``concurrency`` clients sends its
+    next request as soon as the previous answer arrives. Open loop: requests
+    are scheduled ``rate`` per second regardless of answers, and latency is
+    measured from the scheduled time so queueing delay is not hidden. With
+    ``ssl_context`` clients speak TLS and, if ``resume``, resume the session
+    of their previous connection.
+    """
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    schedule = itertools.count()
+    start = time.perf_counter()
+    deadline = start + duration
+
+    def client():
+        nonlocal errors
+        connection = Connection(address, keep_alive, ssl_context=ssl_context, resume=resume)
+        local, failed = [], 0
+        while True:
+            if rate is None:
+                sent = time.perf_counter()
+                if sent >= deadline:
+                    break
+            else:
+                sent = start + next(schedule) / rate
+                if sent >= deadline:
+                    break
+                if (delay := sent - time.perf_counter()) > 0:
+                    time.sleep(delay)
+            try:
+                status, _ = connection.get()
+                if status != 200:
+                    failed += 1
+            except OSError:
+                failed += 1
+                continue
+            local.append(time.perf_counter() - sent)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors += failed
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def bench(config="", duration=2.0, concurrency=16, rate=None, keep_alive=True, tls=None):
+    """Serve ``config`` (serve flags, e.g. "--workers 8") in a new process and measure it.
+
+    ``tls`` ("full" or "resumed") serves HTTPS with a self-signed certificate
+    made with openssl; clients resume sessions only with "resumed". ``rss_kb``
+    is the server process's resident set size once the load has run.
+    """
+    import tempfile
+
+    from hello_world import build_parser
+
+    flags = []
+    ssl_context = None
+    if build_parser().parse_args(shlex.split(config)).processes > 1:
+        raise ValueError("bench measures a single server process; --processes is not supported")
+    with tempfile.TemporaryDirectory() as directory:
+        if tls is not None:
+            from hello_world import tls as tls_module
+
+            certfile, keyfile = tls_module.self_signed(directory, "127.0.0.1")
+            flags += ["--tls-cert", certfile, "--tls-key", keyfile]
+            ssl_context = tls_module.client_context(certfile)
+        process, address, _ = start_server(config, flags, ssl_context)
+    try:
+        latencies, errors, elapsed = run_load(
+            address, duration, concurrency, rate, keep_alive, ssl_context, tls == "resumed"
+        )
+        rss = rss_kb(process.pid)
+    finally:
+        process.terminate()
+        process.wait()
+
+    latencies.sort()
+    ms = {
+        name: None if (value := percentile(latencies, q)) is None else round(value * 1000, 3)
+        for name, q in (("p50_ms", 0.5), ("p99_ms", 0.99), ("p999_ms", 0.999))
+    }
+    return {
+        "config": config or "(default)",
+        "mode": "closed" if rate is None else "open",
+        "concurrency": concurrency,
+        "rate": rate,
+        "keep_alive": keep_alive,
+        "tls": tls,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        **ms,
+        "rss_kb": rss,
+    }
+
+
+def start_server(config="", flags=(), ssl_context=None, timeout=10.0):
+    """Start ``python -m hello_world`` with ``config`` and ``flags`` on a free local port.
+
+    Return the process, its address and the seconds until it answered 200.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        address = sock.getsockname()
+    command = [sys.executable, "-m", "hello_world", *shlex.split(config), *flags]
+    command += ["--bind", address[0], "--port", str(address[1]), "--access-log", "off"]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with status {process.returncode}")
+            try:
+                status, _ = Connection(address, keep_alive=False, ssl_context=ssl_context).get()
+            except OSError:
+                time.sleep(0.001)
+                continue
+            if status == 200:
+                return process, address, time.perf_counter() - start
+        raise TimeoutError(f"no response within {timeout}s")
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+
+
+def time_to_first_response(config="", timeout=10.0):
+    """Start ``python -m hello_world`` with ``config`` and return seconds until it answers 200."""
+    process, _, seconds = start_server(config, timeout=timeout)
+    process.kill()
+    process.wait()
+    return seconds
+
+
+def startup(config="", runs=5):
+    """Measure time to first response of ``runs`` fresh server processes."""
+    times = sorted(time_to_first_response(config) for _ in range(runs))
+    return {
+        "config": config or "(default)",
+        "runs": runs,
+        **{
+            name: round(percentile(times, q) * 1000, 1)
+            for name, q in (("min_ms", 0.0), ("p50_ms", 0.5), ("max_ms", 1.0))
+        },
+    }
+
+
+def main(args):
+    if args.startup:
+        results = [startup(config, args.startup) for config in args.config or DEFAULT_BENCH_CONFIGS]
+    else:
+        results = [
+            bench(
+                config,
+                args.duration,
+                args.concurrency,
+                args.rate,
+                args.keep_alive,
+                args.tls_handshake,
+            )
+            for config in args.config or DEFAULT_BENCH_CONFIGS
+        ]
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,67 @@
+import socket
+import time
+from http import HTTPStatus
+
+
+def build_response(status, body, keep_alive=True, content_type="text/plain", headers=()):
+    """Encode a complete response with Content-Length framing."""
+    status = HTTPStatus(status)
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+    )
+    for name, value in headers:
+        head += f"{name}: {value}\r\n"
+    if not keep_alive:
+        head += "Connection: close\r\n"
+    return f"{head}\r\n".encode("latin-1") + body
+
+
+def add_header(response, name, value):
+    """Return the encoded ``response`` with one more header line."""
+    head, _, body = response.partition(b"\r\n\r\n")
+    return b"%s\r\n%s: %s\r\n\r\n%s" % (head, name.encode(), value.encode("latin-1"), body)
+
+
+class ResponseCache:
+    """The complete hello-world response, encoded once and reused.
+
+    ``get()`` returns the status line, headers and body as a single bytes
+    object so a request costs one send. The hostname is re-read on
+    ``refresh()`` (wired to SIGHUP) and at most once per ``check_interval``
+    seconds, so a renamed host is picked up without a per-request syscall.
+    """
+
+    check_interval = 30.0
+
+    def __init__(self):
+        self.refresh()
+
+    def refresh(self):
+        hostname = socket.gethostname()
+        body = f"hello-world from {hostname}\n".encode()
+        # Indexed by keep_alive: (Connection: close, keep-alive).
+        self.responses = (
+            build_response(HTTPStatus.OK, body, keep_alive=False),
+            build_response(HTTPStatus.OK, body),
+        )
+        self.hostname = hostname
+        self.content_length = len(body)
+        self.checked = time.monotonic()
+
+    def get(self, keep_alive=True):
+        if time.monotonic() - self.checked > self.check_interval:
+            self.checked = time.monotonic()
+            if socket.gethostname() != self.hostname:
+                self.refresh()
+        return self.responses[keep_alive]
+
+
+OVERLOADED_BODY = b"overloaded, retry later\n"
+# Shed connections get this and are closed; Retry-After is in seconds.
+OVERLOADED_RESPONSE = build_response(
+    HTTPStatus.SERVICE_UNAVAILABLE, OVERLOADED_BODY, keep_alive=False, headers=[("Retry-After", 1)]
+)
+
+response_cache = ResponseCache()
@@ -0,0 +1,87 @@
+"""Arguments and shared helpers of the bench and probe subcommands.
+
+Declared apart from their modules so that starting the server does not import
+them; main() imports bench or probe only once one is selected.
+"""
+
+DEFAULT_BENCH_CONFIGS = ("", "--workers 8", "--engine asyncio")
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def add_subcommands(parser):
+    subcommands = parser.add_subparsers(dest="command", title="subcommands")
+    add_bench_arguments(
+        subcommands.add_parser(
+            "bench", help="Measure throughput and latency of serving configurations"
+        )
+    )
+    add_probe_arguments(
+        subcommands.add_parser(
+            "probe", help="Measure how requests to a URL are spread across replicas"
+        )
+    )
+
+
+def add_bench_arguments(parser):
+    parser.add_argument(
+        "-c",
+        "--config",
+        action="append",
+        help="Serve flags for one configuration, e.g. '--workers 8'; repeatable "
+        f"(default: {', '.join(repr(config) for config in DEFAULT_BENCH_CONFIGS)})",
+    )
+    parser.add_argument(
+        "-d", "--duration", type=float, default=5, help="Seconds per configuration (default: 5)"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="Concurrent clients (default: 16)"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="Open-loop arrival rate in requests/s (default: closed loop)",
+    )
+    parser.add_argument(
+        "--no-keep-alive",
+        dest="keep_alive",
+        action="store_false",
+        help="Open a new connection for every request",
+    )
+    parser.add_argument(
+        "--tls-handshake",
+        choices=["full", "resumed"],
+        help="Serve HTTPS with a generated self-signed certificate (needs openssl); clients "
+        "do a full handshake per connection or resume their last session. With "
+        "--no-keep-alive every request is a handshake",
+    )
+    parser.add_argument(
+        "--startup",
+        type=int,
+        metavar="RUNS",
+        help="Instead of load, start each configuration RUNS times as a new process and "
+        "report the time to its first successful response",
+    )
+
+
+def add_probe_arguments(parser):
+    parser.add_argument("url", help="URL to probe, e.g. http://<load balancer>/")
+    parser.add_argument(
+        "-n", "--requests", type=int, default=1000, help="Requests to send (default: 1000)"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=32, help="Concurrent clients (default: 32)"
+    )
+    parser.add_argument(
+        "--no-keep-alive",
+        dest="keep_alive",
+        action="store_false",
+        help="Open a new connection for every request",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=10, help="Seconds per request (default: 10)"
+    )
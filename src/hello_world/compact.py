@@ -0,0 +1,246 @@
+import asyncio
+import time
+from http import HTTPStatus
+
+from hello_world import cache, payload, profiling
+from hello_world.aio import (
+    BAD_REQUEST_BODY,
+    MAX_HEADERS,
+    MAX_LINE,
+    AsyncioServer,
+    BadRequest,
+    set_nodelay,
+)
+
+# Every connection reads into this one buffer; only an incomplete request
+# head is copied out and kept with its connection.
+READ_BUFFER_SIZE = 65536
+
+
+class CompactServer(AsyncioServer):
+    """AsyncioServer that keeps as little as possible per open connection.
+
+    A connection is a ``Connection`` protocol with ``__slots__`` instead of a
+    coroutine with its own task, StreamReader and StreamWriter. Reads go into
+    a buffer shared by all connections, idle connections are closed by one
+    periodic sweep instead of a timer each, and only the payload endpoints,
+    which have to wait, get a task for the length of the request.
+    """
+
+    async def _start_server(self):
+        self._read_buffer = memoryview(bytearray(READ_BUFFER_SIZE))
+        self._open = set()
+        self._sweeper = self._loop.create_task(self._sweep())
+        return await self._loop.create_server(
+            lambda: Connection(self),
+            sock=self.socket,
+            backlog=self.backlog,
+            **self._tls_options(),
+        )
+
+    def _close_idle(self):
+        self._closing_idle = True
+        # Served at least once, not answering a request and nothing of the next one read.
+        idle = float("inf")
+        for connection in [
+            c for c in self._open if c.served and c.idle_since != idle and not c.pending
+        ]:
+            # Aborted rather than closed, as in AsyncioServer._close_idle().
+            connection.transport.abort()
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(self.keepalive_timeout / 4)
+            deadline = time.monotonic() - self.keepalive_timeout
+            for connection in [c for c in self._open if c.idle_since < deadline]:
+                connection.transport.close()
+
+
+def parse_head(head):
+    """Parse a complete request head the way AsyncioServer._read_request does."""
+    lines = head.decode("iso-8859-1").split("\n")
+    words = lines[0].split()
+    if len(words) != 3 or not words[2].startswith("HTTP/1."):
+        raise BadRequest
+    # The head ends with an empty line, so the last two items are "\r" (or "") and "".
+    fields = lines[1:-2]
+    if len(fields) >= MAX_HEADERS:
+        raise BadRequest
+    headers = {}
+    for field in fields:
+        name, sep, value = field.partition(":")
+        if not sep:
+            raise BadRequest
+        headers[name.strip().lower()] = value.strip()
+    length = headers.get("content-length", "0")
+    if not length.isdigit():
+        raise BadRequest
+    return words[0], words[1], words[2], headers, int(length)
+
+
+def head_length(data):
+    """Return the length of the request head at the start of ``data``, or 0 if incomplete."""
+    end = data.find(b"\r\n\r\n")
+    if end >= 0:
+        return end + 4
+    end = data.find(b"\n\n")
+    return end + 2 if end >= 0 else 0
+
+
+class Connection(asyncio.BufferedProtocol):
+    """One client of a CompactServer; also the writer its responses are written to."""
+
+    __slots__ = (
+        "server",
+        "transport",
+        "client",
+        "pending",
+        "skip",
+        "served",
+        "idle_since",
+        "task",
+        "drained",
+    )
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.pending = b""
+        self.skip = 0
+        self.served = 0
+        self.idle_since = time.monotonic()
+        self.task = None
+        self.drained = None
+
+    def connection_made(self, transport):
+        server = self.server
+        self.transport = transport
+        peer = transport.get_extra_info("peername")
+        # Peers of a Unix domain socket have no address.
+        self.client = peer[0] if peer else "-"
+        set_nodelay(transport)
+        server.connections += 1
+        server.metrics.connection_opened()
+        ssl_object = transport.get_extra_info("ssl_object")
+        if ssl_object is not None:
+            server.metrics.tls_handshake(ssl_object.session_reused)
+        server._open.add(self)
+
+    def connection_lost(self, exc):
+        server = self.server
+        server.connections -= 1
+        server.metrics.connection_closed()
+        server._open.discard(self)
+        if self.task is not None:
+            self.task.cancel()
+
+    def get_buffer(self, sizehint):
+        return self.server._read_buffer
+
+    def buffer_updated(self, nbytes):
+        data = self.server._read_buffer[:nbytes].tobytes()
+        if self.skip:
+            skipped = min(self.skip, len(data))
+            self.skip -= skipped
+            data = data[skipped:]
+        if self.pending:
+            data = self.pending + data
+        self.process(data)
+
+    def process(self, data):
+        """Answer every complete request in ``data`` and keep the rest for later."""
+        while data and self.task is None and not self.transport.is_closing():
+            length = head_length(data)
+            if not length:
+                if len(data) > MAX_LINE:
+                    self.reject(data[:MAX_LINE].partition(b"\n")[0], time.perf_counter())
+                break
+            data = self.handle(data[:length], data[length:])
+        self.pending = data
+
+    def handle(self, head, rest):
+        """Answer the request ``head`` and return the bytes that follow it."""
+        server = self.server
+        started = time.perf_counter()
+        self.idle_since = float("inf")
+        request_line = head[: head.find(b"\n") + 1]
+        try:
+            method, target, version, headers, length = parse_head(head)
+        except BadRequest:
+            self.reject(request_line, started)
+            return b""
+        if length > len(rest):
+            self.skip = length - len(rest)
+        rest = rest[length:]
+        timer = None
+        if server.timing:
+            timer = profiling.RequestTimer(started)
+            timer.end("parse")
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            keep_alive = connection == "keep-alive"
+        else:
+            keep_alive = connection != "close"
+        self.served += 1
+        if self.served == server.max_requests or server.draining:
+            keep_alive = False
+        if server.overloaded():
+            self.write(cache.OVERLOADED_RESPONSE)
+            status, size = HTTPStatus.SERVICE_UNAVAILABLE, len(cache.OVERLOADED_BODY)
+            self.finish(request_line, headers, status, size, started, False, timer)
+        elif method == "GET" and target.startswith(payload.PREFIXES):
+            self.transport.pause_reading()
+            self.task = server._loop.create_task(
+                self.dispatch(
+                    request_line, headers, started, method, target, version, keep_alive, timer
+                )
+            )
+        else:
+            status, size = server._route(self, method, target, keep_alive, timer)
+            self.finish(request_line, headers, status, size, started, keep_alive, timer)
+        return rest
+
+    async def dispatch(
+        self, request_line, headers, started, method, target, version, keep_alive, timer
+    ):
+        status, size, keep_alive = await self.server._dispatch(
+            self, method, target, version, keep_alive, timer
+        )
+        await self.drain()
+        self.task = None
+        self.finish(request_line, headers, status, size, started, keep_alive, timer)
+        if not self.transport.is_closing():
+            self.transport.resume_reading()
+            self.process(self.pending)
+
+    def finish(self, request_line, headers, status, size, started, keep_alive, timer):
+        server = self.server
+        server._log(self.client, request_line, headers, status, size, started)
+        if timer is not None:
+            server._trace(request_line, timer)
+        if not keep_alive or status == HTTPStatus.BAD_REQUEST or server._closing_idle:
+            self.transport.close()
+        else:
+            self.idle_since = time.monotonic()
+
+    def reject(self, request_line, started):
+        self.server._respond(self, HTTPStatus.BAD_REQUEST, BAD_REQUEST_BODY, False)
+        status, size = HTTPStatus.BAD_REQUEST, len(BAD_REQUEST_BODY)
+        self.finish(request_line, {}, status, size, started, False, None)
+
+    def write(self, data):
+        self.transport.write(data)
+
+    def writelines(self, data):
+        self.transport.writelines(data)
+
+    async def drain(self):
+        if self.drained is not None:
+            await self.drained
+
+    def pause_writing(self):
+        self.drained = self.server._loop.create_future()
+
+    def resume_writing(self):
+        self.drained.set_result(None)
+        self.drained = None
@@ -0,0 +1,96 @@
+"""Minimal, strict HTTP/1.x request parsing for the common case.
+
+``parse_request_line`` and ``parse_header_block`` accept only plainly
+well-formed requests and return None for anything else, so the caller can
+hand those to the stdlib parser instead of rejecting them.
+"""
+
+# Header blocks larger than this, or with more lines, go to the stdlib parser.
+MAX_HEADER_BLOCK = 8192
+MAX_HEADERS = 100
+VERSIONS = (b"HTTP/1.1", b"HTTP/1.0")
+_TOKEN_PUNCTUATION = b"!#$%&'*+-.^_`|~"
+# Control characters other than horizontal tab.
+_CONTROLS = bytes(range(0x09)) + bytes(range(0x0A, 0x20)) + b"\x7f"
+
+
+class Headers(dict):
+    """Request headers keyed by lower-cased name.
+
+    Lookups are case-insensitive, like the http.client.HTTPMessage that
+    BaseHTTPRequestHandler would otherwise set as ``self.headers``.
+    """
+
+    def __getitem__(self, name):
+        return dict.get(self, name.lower())
+
+    def __contains__(self, name):
+        return dict.__contains__(self, name.lower())
+
+    def get(self, name, default=None):
+        return dict.get(self, name.lower(), default)
+
+    def get_all(self, name, failobj=None):
+        value = dict.get(self, name.lower())
+        return failobj if value is None else [value]
+
+
+def parse_request_line(line):
+    """Split ``line`` into (method, target, version), or return None if it is unusual."""
+    if not line.endswith(b"\r\n"):
+        return None
+    parts = line[:-2].split(b" ")
+    if len(parts) != 3:
+        return None
+    method, target, version = parts
+    if (
+        not method.isalpha()
+        or not method.isupper()
+        or not target.startswith(b"/")
+        or target.startswith(b"//")
+        or version not in VERSIONS
+        or not target.isascii()
+        or _has_controls(target)
+        or b"\t" in target
+    ):
+        return None
+    return method.decode("ascii"), target.decode("ascii"), version.decode("ascii")
+
+
+def parse_header_block(data):
+    """Parse the header block at the start of ``data``.
+
+    Returns (headers, length of the block including the blank line), or None
+    if the block is incomplete, too large or contains anything unusual:
+    obsolete line folding, bare LF line endings, control characters,
+    repeated or non-token header names.
+    """
+    if data.startswith(b"\r\n"):
+        return Headers(), 2
+    end = data.find(b"\r\n\r\n", 0, MAX_HEADER_BLOCK)
+    if end < 0:
+        return None
+    block = data[:end]
+    if _has_controls(block.replace(b"\r\n", b"")):
+        return None
+    lines = block.split(b"\r\n")
+    if len(lines) > MAX_HEADERS:
+        return None
+    headers = Headers()
+    for line in lines:
+        name, sep, value = line.partition(b":")
+        if not sep or not _is_token(name):
+            return None
+        key = name.decode("ascii").lower()
+        if dict.__contains__(headers, key):
+            return None
+        headers[key] = value.lstrip(b" \t").decode("iso-8859-1")
+    return headers, end + 4
+
+
+def _is_token(name):
+    return bool(name) and name.isascii() and name.translate(None, _TOKEN_PUNCTUATION).isalnum()
+
+
+def _has_controls(data):
+    return len(data.translate(None, _CONTROLS)) != len(data)
@@ -0,0 +1,206 @@
+import bisect
+import json
+import threading
+
+from hello_world import shared
+
+# Upper bounds in seconds of the request latency histogram buckets.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# With --processes, bytes of shared memory per worker for its totals.
+SLOT_SIZE = 4096
+
+
+class Shard:
+    """Counters updated by a single thread, so updates need no lock."""
+
+    __slots__ = (
+        "requests",
+        "buckets",
+        "latency_sum",
+        "bytes_written",
+        "connections",
+        "tls_handshakes",
+        "tls_resumed",
+    )
+
+    def __init__(self):
+        self.requests = {}
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.bytes_written = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+        self.tls_resumed = 0
+
+
+class Metrics:
+    """Request metrics kept per thread and summed only when scraped.
+
+    Each serving thread lazily gets its own Shard, so the request path only
+    touches counters no other thread writes. ``render()`` adds the shards up
+    into the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+        self._shared = None
+        self._slot = None
+
+    def shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = Shard()
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def observe(self, status, seconds, size):
+        shard = self.shard()
+        shard.requests[status] = shard.requests.get(status, 0) + 1
+        shard.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        shard.latency_sum += seconds
+        shard.bytes_written += size
+
+    def connection_opened(self):
+        self.shard().connections += 1
+
+    def connection_closed(self):
+        self.shard().connections -= 1
+
+    def tls_handshake(self, resumed):
+        shard = self.shard()
+        shard.tls_handshakes += 1
+        if resumed:
+            shard.tls_resumed += 1
+
+    def active_connections(self):
+        return sum(shard.connections for shard in self._shards)
+
+    def share(self, processes):
+        """Set up shared memory for ``processes`` forked workers; call before forking.
+
+        Each worker then claims a slot and publishes its totals there, and
+        ``render()`` sums every slot, so a scrape reaching any worker sees
+        the whole replica.
+        """
+        self._shared = shared.SharedSlots(processes, SLOT_SIZE)
+
+    def claim(self, slot):
+        """Publish into ``slot`` from now on; call in the worker after forking.
+
+        A worker replacing a dead one keeps its last counts, so counters do
+        not go back when a worker restarts.
+        """
+        self._slot = slot
+        self._base = self._read(slot)
+        self._base["connections"] = 0
+        shared.publish_forever(self._publish)
+
+    def totals(self):
+        """This process's counters summed across threads."""
+        with self._lock:
+            shards = list(self._shards)
+        totals = empty_totals()
+        for shard in shards:
+            add_totals(
+                totals,
+                {
+                    "requests": shard.requests.copy(),
+                    "buckets": shard.buckets,
+                    "latency_sum": shard.latency_sum,
+                    "bytes_written": shard.bytes_written,
+                    "connections": shard.connections,
+                    "tls_handshakes": shard.tls_handshakes,
+                    "tls_resumed": shard.tls_resumed,
+                },
+            )
+        return totals
+
+    def render(self):
+        if self._slot is None:
+            totals = self.totals()
+        else:
+            self._publish()
+            totals = empty_totals()
+            for slot in range(self._shared.count):
+                add_totals(totals, self._read(slot))
+        requests = totals["requests"]
+        buckets = totals["buckets"]
+        latency_sum = totals["latency_sum"]
+        bytes_written = totals["bytes_written"]
+        connections = totals["connections"]
+        tls_handshakes = totals["tls_handshakes"]
+        tls_resumed = totals["tls_resumed"]
+
+        lines = [
+            "# HELP hello_world_requests_total Requests served, by status code.",
+            "# TYPE hello_world_requests_total counter",
+        ]
+        for status in sorted(requests):
+            lines.append(f'hello_world_requests_total{{code="{status}"}} {requests[status]}')
+        lines += [
+            "# HELP hello_world_request_duration_seconds Time from request line to response.",
+            "# TYPE hello_world_request_duration_seconds histogram",
+        ]
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ("+Inf",), buckets):
+            cumulative += count
+            lines.append(
+                f'hello_world_request_duration_seconds_bucket{{le="{bound}"}} {cumulative}'
+            )
+        lines += [
+            f"hello_world_request_duration_seconds_sum {latency_sum}",
+            f"hello_world_request_duration_seconds_count {cumulative}",
+            "# HELP hello_world_response_bytes_total Response body bytes written.",
+            "# TYPE hello_world_response_bytes_total counter",
+            f"hello_world_response_bytes_total {bytes_written}",
+            "# HELP hello_world_active_connections Client connections currently open.",
+            "# TYPE hello_world_active_connections gauge",
+            f"hello_world_active_connections {connections}",
+            "# HELP hello_world_tls_handshakes_total Completed TLS handshakes, by whether "
+            "a session was resumed.",
+            "# TYPE hello_world_tls_handshakes_total counter",
+            f'hello_world_tls_handshakes_total{{resumed="false"}} {tls_handshakes - tls_resumed}',
+            f'hello_world_tls_handshakes_total{{resumed="true"}} {tls_resumed}',
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _publish(self):
+        totals = self.totals()
+        add_totals(totals, self._base)
+        self._shared.write(self._slot, json.dumps(totals).encode())
+
+    def _read(self, slot):
+        data = self._shared.read(slot)
+        if not data:
+            return empty_totals()
+        totals = json.loads(data)
+        totals["requests"] = {int(status): count for status, count in totals["requests"].items()}
+        return totals
+
+
+def empty_totals():
+    return {
+        "requests": {},
+        "buckets": [0] * (len(BUCKETS) + 1),
+        "latency_sum": 0.0,
+        "bytes_written": 0,
+        "connections": 0,
+        "tls_handshakes": 0,
+        "tls_resumed": 0,
+    }
+
+
+def add_totals(totals, other):
+    for status, count in other["requests"].items():
+        totals["requests"][status] = totals["requests"].get(status, 0) + count
+    totals["buckets"] = [total + count for total, count in zip(totals["buckets"], other["buckets"])]
+    for name in ("latency_sum", "bytes_written", "connections", "tls_handshakes", "tls_resumed"):
+        totals[name] += other[name]
+
+
+registry = Metrics()
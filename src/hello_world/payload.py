@@ -0,0 +1,115 @@
+import mmap
+import os
+import socket
+import threading
+
+PREFIXES = ("/bytes/", "/stream/", "/delay/")
+BUFFER_SIZE = 1 << 20
+MAX_BYTES = 1 << 30
+MAX_DELAY_MS = 60_000
+DEFAULT_CHUNK = 64 * 1024
+CONTENT_TYPE = "application/octet-stream"
+_PATTERN = b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789\n"
+
+
+class PayloadBuffer:
+    """A fixed block of filler bytes shared by every payload response.
+
+    The block lives in an anonymous memory file (a temporary file where
+    memfd_create is unavailable) that is written once. Plain sockets are sent
+    to with sendfile, so the kernel copies straight from the page cache;
+    anything else gets zero-copy memoryview slices of an mmap of the same
+    file.
+    """
+
+    def __init__(self, size=BUFFER_SIZE):
+        if hasattr(os, "memfd_create"):
+            self.file = open(os.memfd_create("hello-world-payload"), "w+b")
+        else:
+            import tempfile
+
+            self.file = tempfile.TemporaryFile()
+        self.file.write((_PATTERN * (size // len(_PATTERN) + 1))[:size])
+        self.file.flush()
+        self.size = size
+        self.view = memoryview(mmap.mmap(self.file.fileno(), size, access=mmap.ACCESS_READ))
+
+    def slices(self, length, chunk=None):
+        chunk = min(chunk or self.size, self.size)
+        while length > 0:
+            count = min(length, chunk)
+            yield self.view[:count]
+            length -= count
+
+    def send(self, sock, length):
+        """Write ``length`` bytes of payload to ``sock``."""
+        if type(sock) is socket.socket:
+            while length > 0:
+                count = min(length, self.size)
+                sock.sendfile(self.file, 0, count)
+                length -= count
+        else:
+            for piece in self.slices(length):
+                sock.sendall(piece)
+
+    def send_chunked(self, sock, length, chunk):
+        """Write ``length`` bytes of payload as chunked transfer-coding."""
+        for piece in self.slices(length, chunk):
+            send_buffers(sock, [b"%x\r\n" % len(piece), piece, b"\r\n"])
+        sock.sendall(b"0\r\n\r\n")
+
+
+def send_buffers(sock, buffers):
+    """Gather-write ``buffers`` with sendmsg, without joining them first."""
+    if type(sock) is not socket.socket:
+        for data in buffers:
+            sock.sendall(data)
+        return
+    buffers = [memoryview(data).cast("B") for data in buffers]
+    while buffers:
+        sent = sock.sendmsg(buffers)
+        while buffers and sent >= len(buffers[0]):
+            sent -= len(buffers[0])
+            buffers.pop(0)
+        if buffers and sent:
+            buffers[0] = buffers[0][sent:]
+
+
+def parse(target):
+    """Split a payload target into (kind, amount, chunk); raise ValueError if malformed.
+
+    ``/bytes/<n>`` and ``/stream/<n>?chunk=<k>`` return n bytes, ``/delay/<ms>``
+    returns the hello-world response after ms milliseconds.
+    """
+    path, _, query = target.partition("?")
+    _, kind, amount = path.split("/", 2)
+    if not amount.isdigit():
+        raise ValueError(f"/{kind}/ needs a non-negative integer")
+    amount = int(amount)
+    limit = MAX_DELAY_MS if kind == "delay" else MAX_BYTES
+    if amount > limit:
+        raise ValueError(f"/{kind}/ is limited to {limit}")
+    chunk = None
+    if kind == "stream":
+        chunk = DEFAULT_CHUNK
+        for param in query.split("&"):
+            name, _, value = param.partition("=")
+            if name == "chunk":
+                if not value.isdigit() or not 0 < int(value) <= BUFFER_SIZE:
+                    raise ValueError(f"chunk must be between 1 and {BUFFER_SIZE}")
+                chunk = int(value)
+    return kind, amount, chunk
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def buffer():
+    """Return the process-wide PayloadBuffer, allocating it on first use."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = PayloadBuffer()
+    return _buffer
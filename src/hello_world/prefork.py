@@ -0,0 +1,79 @@
+import os
+import signal
+import time
+import traceback
+
+FORWARDED_SIGNALS = (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGUSR1)
+
+
+class Supervisor:
+    """Fork worker processes and keep them running.
+
+    Every worker runs ``target(index)`` after the fork, which builds and serves
+    its own listening socket, so workers binding the same address with
+    SO_REUSEPORT let the kernel spread connections across them. ``index`` is
+    below ``processes``; a dead worker is restarted with the same one.
+    SIGTERM, SIGINT, SIGHUP and SIGUSR1 are forwarded to every worker, and
+    SIGTERM or SIGINT also stop the supervisor once the workers are gone.
+    Workers start with those signals blocked and their default
+    actions; ``target`` unblocks them once it has installed its own handlers.
+    """
+
+    restart_delay = 1.0
+
+    def __init__(self, target, processes):
+        self.target = target
+        self.processes = processes
+        self.workers = {}
+        self.stopping = False
+
+    def run(self):
+        for signum in FORWARDED_SIGNALS:
+            signal.signal(signum, self._forward)
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, FORWARDED_SIGNALS)
+        for index in range(self.processes):
+            self._spawn(index)
+        while self.workers:
+            pid, status = os.wait()
+            worker = self.workers.pop(pid, None)
+            if worker is None or self.stopping:
+                continue
+            started, index = worker
+            code = os.waitstatus_to_exitcode(status)
+            print(f"Worker {pid} exited with status {code}", flush=True)
+            if time.monotonic() - started < self.restart_delay:
+                time.sleep(self.restart_delay)
+            self._spawn(index)
+
+    def _spawn(self, index):
+        # Block forwarded signals across the fork so a new worker cannot run
+        # the supervisor's handler, or die of a default action, before target
+        # has installed its own; the worker leaves them for target to unblock.
+        signal.pthread_sigmask(signal.SIG_BLOCK, FORWARDED_SIGNALS)
+        try:
+            pid = os.fork()
+            if pid == 0:
+                for signum in FORWARDED_SIGNALS:
+                    signal.signal(signum, signal.SIG_DFL)
+                os._exit(self._serve(index))
+        finally:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, FORWARDED_SIGNALS)
+        self.workers[pid] = time.monotonic(), index
+        print(f"Worker {pid} started", flush=True)
+
+    def _serve(self, index):
+        try:
+            self.target(index)
+        except BaseException:
+            traceback.print_exc()
+            return 1
+        return 0
+
+    def _forward(self, signum, frame):
+        if signum in (signal.SIGTERM, signal.SIGINT):
+            self.stopping = True
+        for pid in self.workers:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import math
+import time
+import urllib.parse
+
+from hello_world.cli import percentile
+
+BODY_PREFIX = b"hello-world from "
+
+
+def backend_of(status, body):
+    """Name the replica that sent ``body``, or the status if it is not a hello-world answer."""
+    if status == 200 and body.startswith(BODY_PREFIX):
+        return body[len(BODY_PREFIX) :].strip().decode("utf-8", "replace")
+    return f"HTTP {status}"
+
+
+async def read_response(reader):
+    """Read one response; return (status, body, whether the server closes)."""
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    status = int(head[0].split(" ", 2)[1])
+    length = None
+    close = chunked = False
+    for line in head[1:]:
+        name, _, value = line.partition(":")
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection":
+            close = value == "close"
+        elif name == "transfer-encoding":
+            chunked = "chunked" in value
+    if chunked:
+        body = b""
+        while size := int((await reader.readuntil(b"\r\n")).split(b";")[0], 16):
+            body += (await reader.readexactly(size + 2))[:-2]
+        while await reader.readuntil(b"\r\n") != b"\r\n":
+            pass
+    elif length is None:
+        body, close = await reader.read(), True
+    else:
+        body = await reader.readexactly(length)
+    return status, body, close
+
+
+def probe(url, requests=1000, concurrency=32, keep_alive=True, timeout=10.0):
+    """Send ``requests`` GETs to ``url`` from ``concurrency`` clients and summarize who answered.
+
+    With ``keep_alive`` each client reuses its connection, so a connection-level
+    load balancer pins it to one replica; without, every request opens a new
+    connection and can be balanced on its own.
+    """
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme != "http" or not parts.hostname:
+        raise ValueError(f"expected an http:// URL, got {url!r}")
+    target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    request = f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+    if not keep_alive:
+        request += "Connection: close\r\n"
+    request = f"{request}\r\n".encode("latin-1")
+    results = []
+    errors = 0
+    pending = iter(range(requests))
+
+    async def client():
+        nonlocal errors
+        reader = writer = None
+        for _ in pending:
+            started = time.perf_counter()
+            close = True
+            try:
+                async with asyncio.timeout(timeout):
+                    if writer is None:
+                        reader, writer = await asyncio.open_connection(
+                            parts.hostname, parts.port or 80
+                        )
+                    writer.write(request)
+                    status, body, close = await read_response(reader)
+            except (OSError, TimeoutError, ValueError, asyncio.IncompleteReadError):
+                errors += 1
+            else:
+                results.append((backend_of(status, body), time.perf_counter() - started))
+            if (close or not keep_alive) and writer is not None:
+                writer.close()
+                reader = writer = None
+        if writer is not None:
+            writer.close()
+
+    async def run():
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+    return summarize(
+        results, errors, elapsed, url=url, keep_alive=keep_alive, concurrency=concurrency
+    )
+
+
+def summarize(results, errors, elapsed, **details):
+    """Turn (backend, seconds) results into per-backend counts, latency and skew."""
+    latencies = {}
+    for backend, seconds in results:
+        latencies.setdefault(backend, []).append(seconds)
+    backends = {}
+    for backend, values in sorted(latencies.items(), key=lambda item: -len(item[1])):
+        values.sort()
+        backends[backend] = {
+            "requests": len(values),
+            "share": round(len(values) / len(results), 4),
+            **{
+                name: round(percentile(values, q) * 1000, 3)
+                for name, q in (("p50_ms", 0.5), ("p99_ms", 0.99), ("max_ms", 1.0))
+            },
+        }
+    counts = [backend["requests"] for backend in backends.values()]
+    skew = None
+    if counts:
+        mean = sum(counts) / len(counts)
+        stdev = math.sqrt(sum((count - mean) ** 2 for count in counts) / len(counts))
+        skew = {
+            "max_over_mean": round(max(counts) / mean, 3),
+            "min_over_mean": round(min(counts) / mean, 3),
+            "cv": round(stdev / mean, 3),
+        }
+    return {
+        **details,
+        "requests": len(results),
+        "errors": errors,
+        "rps": round(len(results) / elapsed, 1) if elapsed else None,
+        "backends": backends,
+        "skew": skew,
+    }
+
+
+def main(args):
+    print(
+        json.dumps(
+            probe(args.url, args.requests, args.concurrency, args.keep_alive, args.timeout),
+            indent=2,
+        )
+    )
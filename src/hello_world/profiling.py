@@ -0,0 +1,100 @@
+import collections
+import os
+import sys
+import threading
+import time
+
+
+class RequestTimer:
+    """Durations of the phases of one request.
+
+    ``end(name)`` closes the phase that began at the previous ``end()`` (or
+    at ``started``). Phases are accept (waiting for a worker, first request
+    of a connection only), parse, handle and write.
+    """
+
+    __slots__ = ("phases", "mark")
+
+    def __init__(self, started, phases=()):
+        self.phases = list(phases)
+        self.mark = started
+
+    def end(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.mark))
+        self.mark = now
+
+    def finish(self):
+        """End the last phase: write once the response is sent, handle if it never was."""
+        self.end("write" if self.phases and self.phases[-1][0] == "handle" else "handle")
+
+    def total(self):
+        return sum(seconds for _, seconds in self.phases)
+
+    def server_timing(self):
+        """Format the phases so far as a Server-Timing header value."""
+        return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.phases)
+
+    def __str__(self):
+        return " ".join(f"{name}={seconds * 1000:.3f}ms" for name, seconds in self.phases)
+
+
+class Sampler:
+    """Sample the stacks of every thread for a fixed window and write them to a file.
+
+    ``start()`` is cheap and safe to call from a signal handler: it starts a
+    daemon thread that records ``sys._current_frames()`` every ``interval``
+    seconds for ``seconds`` seconds, then writes one line per distinct stack
+    in the collapsed format ("thread;outer;...;inner count") read by
+    flamegraph.pl and speedscope. Nothing runs between windows. Sampling is
+    used rather than cProfile, which only sees the thread that enables it.
+    """
+
+    def __init__(self, directory=None, seconds=10.0, interval=0.005):
+        self.directory = directory
+        self.seconds = seconds
+        self.interval = interval
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+        self._thread.start()
+
+    def join(self):
+        if self._thread is not None:
+            self._thread.join()
+
+    def sample(self):
+        """Return a Counter of collapsed stacks seen during one window."""
+        counts = collections.Counter()
+        me = threading.get_ident()
+        deadline = time.monotonic() + self.seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{frame.f_globals.get('__name__', '?')}.{code.co_qualname}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                counts[";".join(reversed(stack))] += 1
+            time.sleep(self.interval)
+        return counts
+
+    def _run(self):
+        import tempfile
+
+        counts = self.sample()
+        path = os.path.join(
+            self.directory or tempfile.gettempdir(),
+            f"hello-world-{os.getpid()}-{time.strftime('%Y%m%dT%H%M%S')}.folded",
+        )
+        with open(path, "w", encoding="utf-8") as output:
+            for stack, count in counts.most_common():
+                output.write(f"{stack} {count}\n")
+        print(f"Wrote {sum(counts.values())} stack samples to {path}", file=sys.stderr, flush=True)
@@ -0,0 +1,59 @@
+import mmap
+import struct
+import threading
+import time
+
+# Sequence number and payload length at the start of every slot.
+HEADER = struct.Struct("QQ")
+# How often, in seconds, workers publish into their slot for the others to read.
+PUBLISH_INTERVAL = 1.0
+
+
+class SharedSlots:
+    """``count`` slots of up to ``size`` bytes in memory shared with forked workers.
+
+    Created before forking; each worker then writes only its own slot and reads
+    everyone's. A seqlock guards every slot: the sequence number is odd while
+    it is written, so readers retry instead of using a torn write.
+    """
+
+    def __init__(self, count, size):
+        self.count = count
+        self.size = size
+        self._memory = mmap.mmap(-1, count * (HEADER.size + size))
+        self._lock = threading.Lock()
+        self._seen = {}
+
+    def write(self, slot, data):
+        if len(data) > self.size:
+            raise ValueError(f"{len(data)} bytes do not fit a {self.size} byte slot")
+        offset = slot * (HEADER.size + self.size)
+        with self._lock:
+            # The sequence number may already be odd if the previous owner of
+            # the slot was killed mid-write.
+            sequence = HEADER.unpack_from(self._memory, offset)[0] | 1
+            HEADER.pack_into(self._memory, offset, sequence, 0)
+            self._memory[offset + HEADER.size : offset + HEADER.size + len(data)] = data
+            HEADER.pack_into(self._memory, offset, sequence + 1, len(data))
+
+    def read(self, slot):
+        """The bytes last written to ``slot``, or those last read if it is being written."""
+        offset = slot * (HEADER.size + self.size)
+        for _ in range(1000):
+            sequence, length = HEADER.unpack_from(self._memory, offset)
+            data = self._memory[offset + HEADER.size : offset + HEADER.size + length]
+            if sequence % 2 == 0 and HEADER.unpack_from(self._memory, offset)[0] == sequence:
+                self._seen[slot] = data
+                return data
+        return self._seen.get(slot, b"")
+
+
+def publish_forever(publish):
+    """Call ``publish`` every PUBLISH_INTERVAL seconds from a daemon thread."""
+
+    def run():
+        while True:
+            time.sleep(PUBLISH_INTERVAL)
+            publish()
+
+    threading.Thread(target=run, daemon=True).start()
@@ -0,0 +1,294 @@
+import array
+import heapq
+import json
+import operator
+import socket
+import struct
+import threading
+import time
+
+from hello_world import shared
+
+# Request rate windows reported by /stats, in seconds.
+WINDOWS = (10, 60, 300)
+# Longer client keys (e.g. a forged X-Forwarded-For) are truncated.
+MAX_KEY = 64
+# Probe and observability requests, which say nothing about who uses the service.
+UNTRACKED = frozenset(("/healthz", "/readyz", "/metrics", "/stats"))
+# Request count at the start of a worker's published stats.
+COUNT = struct.Struct("Q")
+
+
+class CountMinSketch:
+    """Approximate per-key counts in ``width * depth`` fixed counters.
+
+    Estimates never undercount and overcount by at most ``2 / width`` of the
+    total with probability ``1 - 2 ** -depth``, however many keys are seen.
+    """
+
+    def __init__(self, width=4096, depth=4):
+        self.width = width
+        self.depth = depth
+        self.rows = [array.array("Q", bytes(8 * width)) for _ in range(depth)]
+
+    def add(self, key):
+        """Count ``key`` once and return its new estimate."""
+        index, step = self._hashes(key)
+        width = self.width
+        estimate = None
+        for row in self.rows:
+            index %= width
+            count = row[index] = row[index] + 1
+            if estimate is None or count < estimate:
+                estimate = count
+            index += step
+        return estimate
+
+    def estimate(self, key):
+        index, step = self._hashes(key)
+        estimate = None
+        for row in self.rows:
+            index %= self.width
+            if estimate is None or row[index] < estimate:
+                estimate = row[index]
+            index += step
+        return estimate
+
+    def update(self, other):
+        """Add the counts of ``other``, a sketch of the same shape and hashes."""
+        for row, counts in zip(self.rows, other.rows):
+            row[:] = array.array("Q", map(operator.add, row, counts))
+
+    def _hashes(self, key):
+        # Rows use index + row * step from one hash (Kirsch-Mitzenmacher)
+        # instead of hashing the key once per row.
+        value = hash(key) & 0xFFFFFFFFFFFFFFFF
+        return value & 0xFFFFFFFF, (value >> 32) | 1
+
+
+class TopK:
+    """The ``k`` keys with the highest estimates, kept in a min-heap.
+
+    Updating a key already tracked pushes a new heap entry and leaves the old
+    one stale; stale entries are skipped when popped and the heap is rebuilt
+    once it holds more than ``4 * k`` entries, so memory stays bounded.
+    """
+
+    def __init__(self, k=10):
+        self.k = k
+        self.counts = {}
+        self._heap = []
+
+    def offer(self, key, estimate):
+        counts = self.counts
+        if key not in counts and len(counts) >= self.k:
+            heap = self._heap
+            while counts.get(heap[0][1]) != heap[0][0]:
+                heapq.heappop(heap)
+            if estimate <= heap[0][0]:
+                return
+            del counts[heapq.heappop(heap)[1]]
+        counts[key] = estimate
+        heapq.heappush(self._heap, (estimate, key))
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(count, key) for key, count in counts.items()]
+            heapq.heapify(self._heap)
+
+    def most_common(self):
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+
+
+class RateWindows:
+    """Requests per second over the last ``WINDOWS`` seconds.
+
+    One counter per second in a ring buffer as long as the longest window;
+    a slot is reset when its second comes round again.
+    """
+
+    def __init__(self, seconds=max(WINDOWS)):
+        self.seconds = array.array("q", [-1] * seconds)
+        self.counts = array.array("Q", bytes(8 * seconds))
+
+    def add(self, now):
+        second = int(now)
+        slot = second % len(self.seconds)
+        if self.seconds[slot] != second:
+            self.seconds[slot] = second
+            self.counts[slot] = 0
+        self.counts[slot] += 1
+
+    def update(self, other):
+        """Add the counts of ``other``, keeping whichever second is newer in each slot."""
+        for slot, (second, count) in enumerate(zip(other.seconds, other.counts)):
+            if second > self.seconds[slot]:
+                self.seconds[slot] = second
+                self.counts[slot] = count
+            elif second == self.seconds[slot] >= 0:
+                self.counts[slot] += count
+
+    def rate(self, window, now):
+        """Average requests per second over the ``window`` seconds before ``now``."""
+        second = int(now)
+        total = sum(
+            count
+            for started, count in zip(self.seconds, self.counts)
+            if second - window < started <= second
+        )
+        return total / window
+
+
+class Shard:
+    """Traffic seen by a single thread, so updates need no lock."""
+
+    __slots__ = ("requests", "sketch", "top", "rates")
+
+    def __init__(self, top, width, depth):
+        self.requests = 0
+        self.sketch = CountMinSketch(width, depth)
+        self.top = TopK(top)
+        self.rates = RateWindows()
+
+
+class TrafficStats:
+    """Who this replica served, in memory that does not grow with the clients.
+
+    Clients are identified by the first X-Forwarded-For address when a proxy
+    sets one, otherwise by the peer address. Like metrics, each serving thread
+    records into its own Shard; ``snapshot()`` sums the sketches and ranks the
+    clients that made any thread's top list by the summed estimates. With
+    ``share()`` and ``claim()`` forked workers publish their sums to shared
+    memory, so a snapshot from any worker covers them all.
+    """
+
+    def __init__(self, top=10, width=4096, depth=4):
+        self.started = time.time()
+        self.top = top
+        self.width = width
+        self.depth = depth
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+        self._shared = None
+        self._slot = None
+        self._published = None
+
+    def shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = Shard(self.top, self.width, self.depth)
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def record(self, client, forwarded_for=None, path=None):
+        if path in UNTRACKED:
+            return
+        if forwarded_for:
+            client = forwarded_for.split(",", 1)[0].strip()
+        client = client[:MAX_KEY]
+        shard = self.shard()
+        shard.requests += 1
+        shard.top.offer(client, shard.sketch.add(client))
+        shard.rates.add(time.monotonic())
+
+    def share(self, processes):
+        """Set up shared memory for ``processes`` forked workers; call before forking.
+
+        Sketches hash with hash(), so only processes forked from the one that
+        calls this agree on where a client is counted.
+        """
+        top_size = self.top * (6 * MAX_KEY + 32) + 2
+        rates_size = 16 * len(RateWindows().seconds)
+        size = COUNT.size + 8 * self.width * self.depth + rates_size + top_size
+        self._shared = shared.SharedSlots(processes, size)
+
+    def claim(self, slot):
+        """Publish into ``slot`` from now on; call in the worker after forking.
+
+        A worker replacing a dead one starts from its last published counts.
+        """
+        self._slot = slot
+        base = self._decode(self._shared.read(slot))
+        with self._lock:
+            self._shards.append(base)
+        shared.publish_forever(self._publish)
+
+    def most_common(self):
+        return self._combined().top.most_common()
+
+    def snapshot(self):
+        now = time.monotonic()
+        combined = self._combined()
+        return {
+            "hostname": socket.gethostname(),
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "requests": combined.requests,
+            "requests_per_second": {
+                f"{window}s": round(combined.rates.rate(window, now), 3) for window in WINDOWS
+            },
+            "top_clients": [
+                {"client": client, "requests": count}
+                for client, count in combined.top.most_common()
+            ],
+            "sketch": {"width": self.width, "depth": self.depth},
+        }
+
+    def _combined(self):
+        """One Shard summing this process's threads, or every worker's once claimed."""
+        if self._slot is None:
+            with self._lock:
+                shards = list(self._shards)
+            return self._merge(shards)
+        self._publish()
+        return self._merge(
+            [self._decode(self._shared.read(slot)) for slot in range(self._shared.count)]
+        )
+
+    def _merge(self, shards):
+        merged = Shard(self.top, self.width, self.depth)
+        clients = set()
+        for shard in shards:
+            merged.requests += shard.requests
+            merged.sketch.update(shard.sketch)
+            merged.rates.update(shard.rates)
+            clients.update(shard.top.counts.copy())
+        for client in clients:
+            merged.top.offer(client, merged.sketch.estimate(client))
+        return merged
+
+    def _publish(self):
+        with self._lock:
+            shards = list(self._shards)
+        requests = sum(shard.requests for shard in shards)
+        if requests == self._published:
+            return
+        merged = self._merge(shards)
+        self._shared.write(
+            self._slot,
+            COUNT.pack(merged.requests)
+            + b"".join(row.tobytes() for row in merged.sketch.rows)
+            + merged.rates.seconds.tobytes()
+            + merged.rates.counts.tobytes()
+            + json.dumps(merged.top.counts).encode(),
+        )
+        self._published = requests
+
+    def _decode(self, data):
+        shard = Shard(self.top, self.width, self.depth)
+        if not data:
+            return shard
+        (shard.requests,) = COUNT.unpack_from(data)
+        offset = COUNT.size
+        for row in shard.sketch.rows:
+            row[:] = array.array("Q", data[offset : offset + 8 * self.width])
+            offset += 8 * self.width
+        for ring in (shard.rates.seconds, shard.rates.counts):
+            ring[:] = array.array(ring.typecode, data[offset : offset + 8 * len(ring)])
+            offset += 8 * len(ring)
+        for client, count in json.loads(data[offset:]).items():
+            shard.top.offer(client, count)
+        return shard
+
+
+traffic = TrafficStats()
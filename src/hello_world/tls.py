@@ -0,0 +1,40 @@
+import os
+import ssl
+import subprocess
+
+
+def server_context(certfile, keyfile=None):
+    """Build the SSLContext that terminates TLS for every connection of a server.
+
+    Sessions can be resumed two ways, both on by OpenSSL's defaults: from
+    session tickets, which the server encrypts with keys generated when the
+    context is created, and for TLS 1.2 clients without ticket support from
+    the in-memory session cache. A context created before --processes forks
+    shares its ticket keys with every worker, so a ticket issued by one
+    worker resumes on any other.
+    """
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(certfile, keyfile)
+    return context
+
+
+def self_signed(directory, name="localhost"):
+    """Write a self-signed certificate and key for ``name`` to ``directory`` with openssl.
+
+    Returns (certificate path, key path). For tests and benchmarks.
+    """
+    certfile = os.path.join(directory, f"{name}.crt")
+    keyfile = os.path.join(directory, f"{name}.key")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1"]
+        + ["-subj", f"/CN={name}", "-addext", f"subjectAltName=DNS:{name},IP:127.0.0.1"]
+        + ["-keyout", keyfile, "-out", certfile],
+        check=True,
+        capture_output=True,
+    )
+    return certfile, keyfile
+
+
+def client_context(cafile):
+    """An SSLContext for clients that trust only ``cafile``, e.g. from self_signed()."""
+    return ssl.create_default_context(cafile=cafile)
@@ -0,0 +1,52 @@
+import io
+import json
+import threading
+import urllib.request
+
+from hello_world import Handler, HTTPServer
+from hello_world.accesslog import AccessLog
+
+
+def test_combined_format_and_sampling():
+    stream = io.StringIO()
+    log = AccessLog(stream, sample=2, flush_interval=3600)
+    for _ in range(4):
+        log.log("10.0.0.1", "GET / HTTP/1.1", 200, 30, None, "curl/8")
+    log.close()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0].startswith("10.0.0.1 - - [")
+    assert lines[0].endswith('] "GET / HTTP/1.1" 200 30 "-" "curl/8"')
+
+
+def test_full_buffer_drops_oldest_records():
+    stream = io.StringIO()
+    log = AccessLog(stream, format="json", capacity=2, flush_interval=3600)
+    for status in (200, 201, 202):
+        log.log("10.0.0.1", "GET / HTTP/1.1", status, 0)
+    log.close()
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [record.get("status") for record in records[:2]] == [201, 202]
+    assert records[2]["message"] == "dropped 1 log records"
+
+
+def test_handler_logs_through_access_log():
+    stream = io.StringIO()
+    log = AccessLog(stream, format="json", flush_interval=3600)
+    server = HTTPServer(("127.0.0.1", 0), type("Handler", (Handler,), {"access_log": log}))
+    port = server.server_address[1]
+
+    thread = threading.Thread(target=server.handle_request)
+    thread.start()
+    urllib.request.urlopen(f"http://127.0.0.1:{port}/").read()
+    thread.join()
+    server.server_close()
+    log.close()
+
+    (record,) = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert record["remote_addr"] == "127.0.0.1"
+    assert record["request"] == "GET / HTTP/1.1"
+    assert record["status"] == 200
+    assert record["user_agent"].startswith("Python-urllib/")
@@ -0,0 +1,177 @@
+import http.client
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from hello_world import Handler, PooledHTTPServer
+from hello_world.aio import AsyncioServer
+from hello_world.compact import CompactServer
+from hello_world.metrics import Metrics
+
+SERVICE_TIME = 0.05
+CLIENTS = 60
+
+
+class SlowHandler(Handler):
+    access_log = False
+    metrics = Metrics()
+
+    def do_GET(self):
+        time.sleep(SERVICE_TIME)
+        super().do_GET()
+
+
+def get(port):
+    started = time.monotonic()
+    with socket.create_connection(("127.0.0.1", port), timeout=10) as sock:
+        sock.sendall(b"GET / HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+        data = b""
+        while chunk := sock.recv(4096):
+            data += chunk
+    return data, time.monotonic() - started
+
+
+def test_flood_is_shed_and_admitted_latency_stays_bounded():
+    server = PooledHTTPServer(("127.0.0.1", 0), SlowHandler, workers=2, max_inflight=4)
+    port = server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    results = []
+    clients = [threading.Thread(target=lambda: results.append(get(port))) for _ in range(CLIENTS)]
+    try:
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+    admitted = [latency for data, latency in results if data.startswith(b"HTTP/1.1 200 ")]
+    shed = [(data, latency) for data, latency in results if data.startswith(b"HTTP/1.1 503 ")]
+    assert len(admitted) + len(shed) == CLIENTS
+    assert admitted and shed
+    # Queueing every request would put the last one behind
+    # 60 requests / 2 workers * 50ms = 1.5s of work.
+    assert max(admitted) < 0.5
+    assert all(b"\r\nRetry-After: 1\r\n" in data for data, _ in shed)
+    assert max(latency for _, latency in shed) < 0.5
+
+
+@pytest.mark.parametrize("server_class", [AsyncioServer, CompactServer], ids=["asyncio", "compact"])
+def test_event_loop_engines_shed_requests_not_idle_connections(server_class):
+    server = server_class(("127.0.0.1", 0), metrics=Metrics(), max_inflight=2)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    address = server.server_address
+    idle = [http.client.HTTPConnection(*address, timeout=5) for _ in range(3)]
+    try:
+        for conn in idle:
+            conn.request("GET", "/")
+            assert conn.getresponse().read().startswith(b"hello-world from ")
+        # Three idle keep-alive connections, none of them in progress.
+        assert get(address[1])[0].startswith(b"HTTP/1.1 200 ")
+
+        slow = [socket.create_connection(address, timeout=5) for _ in range(2)]
+        for sock in slow:
+            sock.sendall(b"GET /delay/500 HTTP/1.1\r\nHost: x\r\n\r\n")
+        deadline = time.monotonic() + 5
+        while server.inflight() < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        data, _ = get(address[1])
+        assert data.startswith(b"HTTP/1.1 503 ")
+        assert b"\r\nRetry-After: 1\r\n" in data
+        for sock in slow:
+            assert sock.recv(65536).startswith(b"HTTP/1.1 200 ")
+            sock.close()
+        idle[0].request("GET", "/")
+        assert idle[0].getresponse().status == 200
+    finally:
+        for conn in idle:
+            conn.close()
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+
+def test_pool_closes_busy_keep_alive_connections_while_others_wait():
+    server = PooledHTTPServer(("127.0.0.1", 0), SlowHandler, workers=2)
+    address = server.server_address
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    stop = threading.Event()
+
+    def busy_client():
+        # Keeps its connection busy: a request every 200ms, reconnecting when closed.
+        conn = http.client.HTTPConnection(*address, timeout=5)
+        while not stop.is_set():
+            conn.request("GET", "/")
+            response = conn.getresponse()
+            response.read()
+            if response.will_close:
+                conn.close()
+            time.sleep(0.2)
+        conn.close()
+
+    clients = [threading.Thread(target=busy_client) for _ in range(3)]
+    try:
+        for client in clients:
+            client.start()
+        time.sleep(0.5)
+        # More active keep-alive clients than workers: a new one still gets
+        # its answer within a request or two rather than waiting them out.
+        data, latency = get(address[1])
+        assert data.startswith(b"HTTP/1.1 200 ")
+        assert latency < 1.0
+    finally:
+        stop.set()
+        for client in clients:
+            client.join()
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+
+def test_pool_answers_probes_and_sheds_when_the_queue_is_full():
+    server = PooledHTTPServer(("127.0.0.1", 0), Handler, workers=1, queue_size=1)
+    address = server.server_address
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    slow = []
+    try:
+        for _ in range(2):
+            slow.append(socket.create_connection(address, timeout=5))
+            slow[-1].sendall(b"GET /delay/1000 HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+            time.sleep(0.1)
+        # One request in progress and the queue full: the accept thread
+        # still answers probes, and sheds other requests instead of blocking.
+        probe = http.client.HTTPConnection(*address, timeout=0.5)
+        probe.request("GET", "/healthz")
+        assert probe.getresponse().status == 200
+        probe.close()
+        data, latency = get(address[1])
+        assert data.startswith(b"HTTP/1.1 503 ")
+        assert latency < 0.5
+        for sock in slow:
+            assert sock.recv(65536).startswith(b"HTTP/1.1 200 ")
+    finally:
+        for sock in slow:
+            sock.close()
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+
+@pytest.mark.parametrize("flag", ["--max-inflight", "--ready-max-inflight"])
+def test_inflight_limits_require_a_queue(flag):
+    result = subprocess.run(
+        [sys.executable, "-m", "hello_world", flag, "4"], capture_output=True, text=True
+    )
+    assert result.returncode == 2
+    assert f"{flag} requires --workers or --engine asyncio/compact" in result.stderr
@@ -0,0 +1,70 @@
+import http.client
+import socket
+import threading
+
+import pytest
+
+from hello_world.aio import AsyncioServer
+
+
+@pytest.fixture
+def server():
+    server = AsyncioServer(("127.0.0.1", 0))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def test_asyncio_engine_keeps_connection_alive(server):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    conn.request("GET", "/")
+    first = conn.getresponse()
+    assert first.status == 200
+    assert first.read().decode().startswith("hello-world from ")
+    sock = conn.sock
+
+    conn.request("GET", "/")
+    second = conn.getresponse()
+    assert second.read().decode().startswith("hello-world from ")
+    assert conn.sock is sock
+    conn.close()
+
+
+def test_asyncio_engine_rejects_unsupported_method(server):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    conn.request("POST", "/", body=b"ignored")
+    response = conn.getresponse()
+    assert response.status == 501
+    response.read()
+    conn.close()
+
+
+def test_asyncio_engine_pipelining_until_max_requests():
+    server = AsyncioServer(("127.0.0.1", 0), max_requests=2)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        with socket.create_connection(server.server_address, timeout=5) as sock:
+            sock.sendall(b"GET / HTTP/1.1\r\nHost: x\r\n\r\n" * 3)
+            data = b""
+            while chunk := sock.recv(65536):
+                data += chunk
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+    assert data.count(b"HTTP/1.1 200 OK") == 2
+    assert data.count(b"Connection: close") == 1
+
+
+def test_asyncio_engine_serves_metrics(server):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    conn.request("GET", "/metrics")
+    response = conn.getresponse()
+    assert response.status == 200
+    assert "hello_world_active_connections" in response.read().decode()
+    conn.close()
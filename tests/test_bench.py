@@ -0,0 +1,26 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from hello_world.bench import bench
+
+BASELINE = Path(__file__).with_name("bench_baseline.json")
+baseline = json.loads(BASELINE.read_text())
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("config", sorted(baseline["configs"]))
+def test_no_regression_against_baseline(config):
+    result = bench(config, baseline["duration"], baseline["concurrency"])
+    assert result["errors"] == 0
+
+    if os.environ.get("HELLO_WORLD_BENCH_UPDATE"):
+        baseline["configs"][config] = {"rps": result["rps"], "p99_ms": result["p99_ms"]}
+        BASELINE.write_text(json.dumps(baseline, indent=2) + "\n")
+        return
+
+    expected = baseline["configs"][config]
+    assert result["rps"] >= expected["rps"] * (1 - baseline["rps_tolerance"]), result
+    assert result["p99_ms"] <= expected["p99_ms"] * (1 + baseline["p99_tolerance"]), result
@@ -0,0 +1,27 @@
+import socket
+
+from hello_world.cache import ResponseCache
+
+
+def test_response_is_complete_and_framed():
+    cache = ResponseCache()
+    head, body = cache.get().split(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200 OK\r\n")
+    assert f"Content-Length: {len(body)}".encode() in head
+    assert body == f"hello-world from {socket.gethostname()}\n".encode()
+    assert b"Connection: close" in cache.get(keep_alive=False)
+
+
+def test_hostname_change_is_picked_up(monkeypatch):
+    cache = ResponseCache()
+    cache.check_interval = 0
+    monkeypatch.setattr(socket, "gethostname", lambda: "pod-b")
+    assert cache.get().endswith(b"hello-world from pod-b\n")
+
+
+def test_refresh_rebuilds_response(monkeypatch):
+    cache = ResponseCache()
+    monkeypatch.setattr(socket, "gethostname", lambda: "pod-c")
+    assert not cache.get().endswith(b"pod-c\n")
+    cache.refresh()
+    assert cache.get().endswith(b"hello-world from pod-c\n")
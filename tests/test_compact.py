@@ -0,0 +1,148 @@
+import gc
+import http.client
+import socket
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+import pytest
+
+from hello_world.compact import CompactServer, parse_head
+from hello_world.metrics import Metrics
+from hello_world.stats import TrafficStats
+
+# Measured at about 2.9 KB per idle keep-alive connection on CPython 3.13,
+# against about 7.3 KB for AsyncioServer.
+BYTES_PER_CONNECTION_BUDGET = 4096
+
+CLIENTS = """
+import socket, sys
+address = ("127.0.0.1", int(sys.argv[1]))
+clients = [socket.create_connection(address) for _ in range(int(sys.argv[2]))]
+for client in clients:
+    client.sendall(b"GET / HTTP/1.1\\r\\nHost: x\\r\\n\\r\\n")
+for client in clients:
+    client.recv(65536)
+print("ready", flush=True)
+sys.stdin.read()
+"""
+
+
+def start(**kwargs):
+    server = CompactServer(("127.0.0.1", 0), metrics=Metrics(), stats=TrafficStats(), **kwargs)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    return server, thread
+
+
+def stop(server, thread):
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def exchange(address, data):
+    with socket.create_connection(address, timeout=5) as sock:
+        sock.sendall(data)
+        received = b""
+        while chunk := sock.recv(65536):
+            received += chunk
+    return received
+
+
+@pytest.fixture
+def server():
+    server, thread = start()
+    yield server
+    stop(server, thread)
+
+
+def test_parse_head():
+    head = b"GET /x HTTP/1.1\r\nHost: a\r\nCONTENT-length: 3\r\n\r\n"
+    assert parse_head(head) == ("GET", "/x", "HTTP/1.1", {"host": "a", "content-length": "3"}, 3)
+    assert parse_head(b"GET / HTTP/1.0\n\n") == ("GET", "/", "HTTP/1.0", {}, 0)
+
+
+def test_compact_engine_keeps_connection_alive(server):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    conn.request("GET", "/")
+    assert conn.getresponse().read().decode().startswith("hello-world from ")
+    sock = conn.sock
+    conn.request("GET", "/healthz")
+    assert conn.getresponse().read() == b"ok\n"
+    assert conn.sock is sock
+    conn.close()
+
+
+def test_compact_engine_reassembles_split_requests_and_skips_bodies(server):
+    with socket.create_connection(server.server_address, timeout=5) as sock:
+        for piece in (b"POST / HTTP/1.1\r\nContent-", b"Length: 6\r\n\r\nab", b"cdefGET /hea"):
+            sock.sendall(piece)
+            time.sleep(0.05)
+        sock.sendall(b"lthz HTTP/1.1\r\nConnection: close\r\n\r\n")
+        data = b""
+        while chunk := sock.recv(65536):
+            data += chunk
+    assert data.startswith(b"HTTP/1.1 501 ")
+    assert data.count(b"HTTP/1.1 ") == 2
+    assert data.endswith(b"ok\n")
+
+
+def test_compact_engine_pipelining_until_max_requests():
+    server, thread = start(max_requests=2)
+    try:
+        data = exchange(server.server_address, b"GET / HTTP/1.1\r\nHost: x\r\n\r\n" * 3)
+    finally:
+        stop(server, thread)
+    assert data.count(b"HTTP/1.1 200 OK") == 2
+    assert data.count(b"Connection: close") == 1
+
+
+def test_compact_engine_rejects_bad_requests(server):
+    assert exchange(server.server_address, b"GET /\r\n\r\n").startswith(b"HTTP/1.1 400 ")
+    oversized = b"GET / HTTP/1.1\r\nX-Big: " + b"a" * 70000
+    assert exchange(server.server_address, oversized).startswith(b"HTTP/1.1 400 ")
+
+
+def test_compact_engine_closes_idle_connections():
+    server, thread = start(keepalive_timeout=0.2)
+    try:
+        with socket.create_connection(server.server_address, timeout=5) as sock:
+            started = time.monotonic()
+            assert sock.recv(1) == b""
+            assert time.monotonic() - started < 2
+        assert server.connections == 0
+    finally:
+        stop(server, thread)
+
+
+def test_compact_engine_memory_per_connection():
+    count = 2000
+    server, thread = start(keepalive_timeout=60, max_requests=0)
+    # The clients run in another process so that tracemalloc only sees the server.
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        clients = subprocess.Popen(
+            [sys.executable, "-c", CLIENTS, str(server.server_address[1]), str(count)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            assert clients.stdout.readline() == "ready\n"
+            deadline = time.monotonic() + 10
+            while server.connections < count and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert server.connections == count
+            gc.collect()
+            per_connection = (tracemalloc.get_traced_memory()[0] - before) / count
+        finally:
+            clients.stdin.close()
+            clients.wait()
+    finally:
+        tracemalloc.stop()
+        stop(server, thread)
+    assert per_connection < BYTES_PER_CONNECTION_BUDGET, per_connection
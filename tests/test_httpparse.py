@@ -0,0 +1,136 @@
+import io
+import random
+import socket
+import threading
+
+import pytest
+
+from hello_world import Handler, build_parser, httpparse, make_server
+from hello_world.metrics import Metrics
+
+REQUESTS = [
+    b"GET / HTTP/1.1\r\nHost: example\r\n\r\n",
+    b"GET / HTTP/1.1\r\n\r\n",
+    b"GET /healthz HTTP/1.0\r\n\r\n",
+    b"GET / HTTP/1.0\r\nConnection: keep-alive\r\n\r\n",
+    b"GET / HTTP/1.1\r\nconnection: Close\r\n\r\n",
+    b"GET /stream/10?chunk=2 HTTP/1.1\r\nHost: a\r\nUser-Agent: curl/8.5.0\r\nAccept: */*\r\n\r\n",
+    b"GET / HTTP/1.1\r\nHost: a\r\nReferer: http://b/\r\nX-Trailing: v \t\r\nX-Empty:\r\n\r\n",
+    b"GET / HTTP/1.1\r\nX-Latin: caf\xe9\r\nX-Tab:\tv\r\n\r\nGET / HTTP/1.1\r\n\r\n",
+    b"POST /x HTTP/1.1\r\nContent-Length: 3\r\n\r\nabc",
+    # Everything below is left to the stdlib parser.
+    b"GET / HTTP/1.1\r\nHost: a\r\nHost: b\r\n\r\n",
+    b"GET / HTTP/1.1\r\nX-Folded: a\r\n b\r\n\r\n",
+    b"GET / HTTP/1.1\nHost: a\n\n",
+    b"GET / HTTP/1.1\r\nHost : a\r\n\r\n",
+    b"GET / HTTP/1.1\r\nExpect: 100-continue\r\n\r\n",
+    b"GET //evil.example/ HTTP/1.1\r\n\r\n",
+    b"GET  /  HTTP/1.1\r\n\r\n",
+    b"GET / HTTP/2.0\r\n\r\n",
+    b"GET / HTTP/1.1\r\nX-Control: a\x01b\r\n\r\n",
+    b"GET /caf\xe9 HTTP/1.1\r\n\r\n",
+    b"GET /\r\n",
+    b"GET / HTTP/1.1\r\n" + b"X-Big: " + b"a" * 9000 + b"\r\n\r\n",
+    b"GET / HTTP/1.1\r\n" + b"".join(b"X-%d: a\r\n" % i for i in range(101)) + b"\r\n",
+]
+
+
+class ParseHandler(Handler):
+    access_log = False
+    metrics = Metrics()
+
+
+def parse(data, fast_parser):
+    """Run Handler.parse_request over ``data`` and return everything it decided."""
+    handler = ParseHandler.__new__(ParseHandler)
+    handler.fast_parser = fast_parser
+    handler.client_address = ("127.0.0.1", 0)
+    handler.rfile = io.BufferedReader(io.BytesIO(data))
+    handler.wfile = io.BytesIO()
+    handler.raw_requestline = handler.rfile.readline(65537)
+    ok = handler.parse_request()
+    headers = getattr(handler, "headers", None) if ok else None
+    return {
+        "ok": ok,
+        "command": handler.command,
+        "path": getattr(handler, "path", None),
+        "version": handler.request_version,
+        "close": handler.close_connection,
+        "headers": None if headers is None else [(k.lower(), v) for k, v in headers.items()],
+        "rest": handler.rfile.read(),
+        "status": handler.wfile.getvalue()[:12],
+    }
+
+
+@pytest.mark.parametrize("data", REQUESTS)
+def test_fast_parser_matches_stdlib(data):
+    assert parse(data, fast_parser=True) == parse(data, fast_parser=False)
+
+
+def test_fast_path_is_taken_for_plain_requests():
+    for data in REQUESTS[:9]:
+        line, _, rest = data.partition(b"\r\n")
+        assert httpparse.parse_request_line(line + b"\r\n") is not None
+        assert httpparse.parse_header_block(rest) is not None
+    for data in REQUESTS[9:]:
+        line, _, rest = data.partition(b"\r\n")
+        request = httpparse.parse_request_line(line + b"\r\n")
+        headers = httpparse.parse_header_block(rest)
+        assert request is None or headers is None or "expect" in headers[0]
+
+
+def test_headers_lookup_is_case_insensitive():
+    headers, length = httpparse.parse_header_block(b"User-Agent: x\r\n\r\nbody")
+    assert length == 17
+    assert headers["user-agent"] == headers.get("USER-AGENT") == "x"
+    assert "User-Agent" in headers
+    assert headers.get("Referer") is None
+
+
+def mutate(rng, data):
+    data = bytearray(data)
+    for _ in range(rng.randint(1, 4)):
+        position = rng.randrange(len(data) + 1)
+        operation = rng.randrange(4)
+        if operation == 0:
+            data.insert(position, rng.choice(b" \t\r\n:/-\x00\x7f\xe9aZ"))
+        elif operation == 1:
+            del data[position : position + rng.randint(1, 3)]
+        elif operation == 2:
+            data[position:position] = rng.choice([b"\r\n", b"X-A: b\r\n", b"Connection: close\r\n"])
+        else:
+            data[position : position + 1] = data[position : position + 1].swapcase()
+    return bytes(data)
+
+
+def test_fuzzed_requests_parse_like_stdlib():
+    rng = random.Random(13)
+    for _ in range(3000):
+        data = mutate(rng, rng.choice(REQUESTS[:9]))
+        assert parse(data, fast_parser=True) == parse(data, fast_parser=False), data
+
+
+def test_server_with_fast_parser():
+    args = build_parser().parse_args(
+        ["--bind", "127.0.0.1", "--port", "0", "--workers", "2", "--parser", "fast"]
+        + ["--access-log", "off"]
+    )
+    server = make_server(args)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        with socket.create_connection(server.server_address, timeout=5) as client:
+            client.sendall(
+                b"GET / HTTP/1.1\r\nHost: a\r\n\r\n"
+                b"GET /healthz HTTP/1.1\r\nConnection: close\r\n\r\n"
+            )
+            data = b""
+            while chunk := client.recv(65536):
+                data += chunk
+        assert data.count(b"HTTP/1.1 200 OK") == 2
+        assert b"hello-world from " in data
+        assert data.endswith(b"ok\n")
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
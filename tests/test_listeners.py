@@ -0,0 +1,109 @@
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from hello_world import build_parser, make_server, open_listener
+
+MODES = [[], ["--workers", "2"], ["--engine", "asyncio"], ["--engine", "compact"]]
+MODE_IDS = ["serial", "pool", "asyncio", "compact"]
+
+
+def get(sock):
+    with sock:
+        sock.settimeout(5)
+        sock.sendall(b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n")
+        data = b""
+        while chunk := sock.recv(65536):
+            data += chunk
+    return data
+
+
+def connect_unix(path, attempts=100):
+    for _ in range(attempts):
+        sock = socket.socket(socket.AF_UNIX)
+        try:
+            sock.connect(str(path))
+            return sock
+        except OSError:
+            sock.close()
+            time.sleep(0.05)
+    raise AssertionError("server never listened")
+
+
+@pytest.mark.parametrize("mode", MODES, ids=MODE_IDS)
+def test_unix_socket(tmp_path, mode):
+    path = tmp_path / "hello.sock"
+    log = tmp_path / "access.log"
+    args = build_parser().parse_args(["--unix", str(path), "--access-log", str(log)] + mode)
+    server = make_server(args, sock=open_listener(args))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        assert get(connect_unix(path)).endswith(
+            f"hello-world from {socket.gethostname()}\n".encode()
+        )
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+        server.access_log.close()
+    assert log.read_text().startswith("- - - [")
+
+
+@pytest.mark.parametrize("mode", MODES, ids=MODE_IDS)
+def test_inherited_socket(mode):
+    listener = socket.create_server(("127.0.0.1", 0))
+    args = build_parser().parse_args(["--fd", str(listener.fileno()), "--access-log", "off"] + mode)
+    server = make_server(args, sock=open_listener(args))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        response = get(socket.create_connection(listener.getsockname(), timeout=5))
+        assert response.startswith(b"HTTP/1.1 200 OK")
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+        listener.detach()
+
+
+def test_stale_unix_socket_is_replaced(tmp_path):
+    path = tmp_path / "hello.sock"
+    with socket.socket(socket.AF_UNIX) as stale:
+        stale.bind(str(path))
+    args = build_parser().parse_args(["--unix", str(path)])
+    open_listener(args).close()
+
+
+@pytest.mark.parametrize("listen", ["unix", "fd"])
+def test_prefork_workers_share_listener(tmp_path, listen):
+    command = [sys.executable, "-m", "hello_world", "--processes", "2", "--access-log", "off"]
+    listener = None
+    if listen == "unix":
+        path = tmp_path / "hello.sock"
+        command += ["--unix", str(path)]
+        pass_fds = ()
+    else:
+        listener = socket.create_server(("127.0.0.1", 0))
+        command += ["--fd", str(listener.fileno())]
+        pass_fds = (listener.fileno(),)
+    proc = subprocess.Popen(command, stdout=subprocess.DEVNULL, pass_fds=pass_fds)
+    try:
+        for _ in range(4):
+            if listen == "unix":
+                sock = connect_unix(path)
+            else:
+                sock = socket.create_connection(listener.getsockname(), timeout=5)
+            assert get(sock).startswith(b"HTTP/1.1 200 OK")
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0
+        if listener is not None:
+            listener.close()
+    if listen == "unix":
+        assert not path.exists()
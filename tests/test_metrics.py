@@ -0,0 +1,79 @@
+import threading
+import urllib.request
+
+from hello_world import Handler, PooledHTTPServer
+from hello_world.metrics import Metrics
+
+
+def test_shards_are_summed_at_scrape_time():
+    metrics = Metrics()
+
+    def serve(status):
+        metrics.connection_opened()
+        for _ in range(3):
+            metrics.observe(status, 0.002, 10)
+
+    threads = [threading.Thread(target=serve, args=(status,)) for status in (200, 200, 503)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    text = metrics.render()
+    assert 'hello_world_requests_total{code="200"} 6' in text
+    assert 'hello_world_requests_total{code="503"} 3' in text
+    assert 'hello_world_request_duration_seconds_bucket{le="0.001"} 0' in text
+    assert 'hello_world_request_duration_seconds_bucket{le="0.0025"} 9' in text
+    assert 'hello_world_request_duration_seconds_bucket{le="+Inf"} 9' in text
+    assert "hello_world_request_duration_seconds_count 9" in text
+    assert "hello_world_response_bytes_total 90" in text
+    assert "hello_world_active_connections 3" in text
+
+
+def test_metrics_endpoint():
+    metrics = Metrics()
+    handler = type("Handler", (Handler,), {"metrics": metrics, "access_log": False})
+    server = PooledHTTPServer(("127.0.0.1", 0), handler, workers=2)
+    port = server.server_address[1]
+
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        urllib.request.urlopen(f"http://127.0.0.1:{port}/").read()
+        response = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics")
+        text = response.read().decode()
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert 'hello_world_requests_total{code="200"} 1' in text
+    assert "hello_world_active_connections 1" in text
+
+
+def test_shared_slots_are_summed_and_survive_a_restart():
+    first, second, restarted = Metrics(), Metrics(), Metrics()
+    first.share(2)
+    second._shared = restarted._shared = first._shared
+    first.claim(0)
+    second.claim(1)
+    first.observe(200, 0.002, 10)
+    second.observe(200, 0.002, 10)
+    second.observe(404, 0.002, 10)
+    second.connection_opened()
+    second.render()
+
+    text = first.render()
+    assert 'hello_world_requests_total{code="200"} 2' in text
+    assert 'hello_world_requests_total{code="404"} 1' in text
+    assert "hello_world_response_bytes_total 30" in text
+    assert "hello_world_active_connections 1" in text
+
+    # A worker replacing the second one keeps its counts but not its connections.
+    restarted.claim(1)
+    restarted.observe(200, 0.002, 10)
+    restarted.render()
+    text = first.render()
+    assert 'hello_world_requests_total{code="200"} 3' in text
+    assert "hello_world_active_connections 0" in text
@@ -0,0 +1,76 @@
+import http.client
+import threading
+import time
+
+import pytest
+
+from hello_world import Handler, PooledHTTPServer, payload
+from hello_world.aio import AsyncioServer
+from hello_world.compact import CompactServer
+from hello_world.metrics import Metrics
+
+
+def expected(length, chunk=None):
+    return b"".join(bytes(piece) for piece in payload.buffer().slices(length, chunk))
+
+
+@pytest.fixture(params=["stdlib", "asyncio", "compact"])
+def address(request):
+    if request.param == "stdlib":
+        handler = type("Handler", (Handler,), {"access_log": False, "metrics": Metrics()})
+        server = PooledHTTPServer(("127.0.0.1", 0), handler, workers=2)
+    elif request.param == "asyncio":
+        server = AsyncioServer(("127.0.0.1", 0), metrics=Metrics())
+    else:
+        server = CompactServer(("127.0.0.1", 0), metrics=Metrics())
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server.server_address[:2]
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def get(address, target):
+    conn = http.client.HTTPConnection(*address, timeout=10)
+    conn.request("GET", target)
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+
+def test_parse():
+    assert payload.parse("/bytes/10") == ("bytes", 10, None)
+    assert payload.parse("/stream/10") == ("stream", 10, payload.DEFAULT_CHUNK)
+    assert payload.parse("/stream/10?chunk=3") == ("stream", 10, 3)
+    assert payload.parse("/delay/5") == ("delay", 5, None)
+    for target in ("/bytes/-1", "/bytes/x", "/stream/1?chunk=0", f"/delay/{10**9}"):
+        with pytest.raises(ValueError):
+            payload.parse(target)
+
+
+def test_bytes_larger_than_buffer(address):
+    length = payload.BUFFER_SIZE * 2 + 123
+    response, body = get(address, f"/bytes/{length}")
+    assert response.status == 200
+    assert response.headers["Content-Length"] == str(length)
+    assert body == expected(length)
+
+
+def test_stream_is_chunked(address):
+    response, body = get(address, "/stream/100000?chunk=30000")
+    assert response.headers["Transfer-Encoding"] == "chunked"
+    assert body == expected(100000, 30000)
+
+
+def test_delay(address):
+    started = time.monotonic()
+    response, body = get(address, "/delay/100")
+    assert time.monotonic() - started >= 0.1
+    assert body.startswith(b"hello-world from ")
+
+
+def test_bad_payload_request(address):
+    response, _ = get(address, "/bytes/lots")
+    assert response.status == 400
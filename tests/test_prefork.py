@@ -0,0 +1,141 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def read_worker_pid(proc):
+    while line := proc.stdout.readline():
+        if line.startswith("Worker ") and line.rstrip().endswith(" started"):
+            return int(line.split()[1])
+    raise AssertionError("supervisor exited before starting a worker")
+
+
+def get(port, attempts=50):
+    for _ in range(attempts):
+        try:
+            return urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5).read().decode()
+        except OSError:
+            time.sleep(0.1)
+    raise AssertionError("server never answered")
+
+
+def test_prefork_restarts_workers_and_forwards_sigterm():
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-u", "-m", "hello_world", "-b", "127.0.0.1", "-p", str(port)]
+        + ["--processes", "2"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        pids = {read_worker_pid(proc), read_worker_pid(proc)}
+        assert get(port).startswith("hello-world from ")
+
+        killed = pids.pop()
+        os.kill(killed, signal.SIGKILL)
+        pids.add(read_worker_pid(proc))
+        assert killed not in pids
+        assert get(port).startswith("hello-world from ")
+
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0
+        for pid in pids:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                continue
+            raise AssertionError(f"worker {pid} outlived the supervisor")
+    finally:
+        proc.kill()
+        proc.wait()
+        proc.stdout.close()
+
+
+def test_signal_to_a_starting_worker_waits_for_its_handlers(tmp_path):
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-u", "-m", "hello_world", "-b", "127.0.0.1", "-p", str(port)]
+        + ["--processes", "2", "--profile-dir", str(tmp_path), "--profile-seconds", "0.1"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        pids = {read_worker_pid(proc), read_worker_pid(proc)}
+        for pid in pids:
+            os.kill(pid, signal.SIGUSR1)
+        assert get(port).startswith("hello-world from ")
+        for pid in pids:
+            os.kill(pid, 0)
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0
+        assert "exited with status" not in proc.stdout.read()
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def test_metrics_count_requests_served_by_every_worker():
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-u", "-m", "hello_world", "-b", "127.0.0.1", "-p", str(port)]
+        + ["--processes", "2", "--access-log", "off"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        read_worker_pid(proc)
+        read_worker_pid(proc)
+        for _ in range(20):
+            get(port)
+        # Let the worker not scraped publish its totals.
+        time.sleep(1.5)
+        counts = []
+        for _ in range(6):
+            text = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read()
+            for line in text.decode().splitlines():
+                if line.startswith('hello_world_requests_total{code="200"}'):
+                    counts.append(int(line.split()[1]))
+        assert len(counts) == 6
+        assert counts[0] >= 20
+        assert counts == sorted(counts)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=10)
+        proc.stdout.close()
+
+
+def test_stats_count_requests_served_by_every_worker():
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-u", "-m", "hello_world", "-b", "127.0.0.1", "-p", str(port)]
+        + ["--processes", "2", "--access-log", "off"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        read_worker_pid(proc)
+        read_worker_pid(proc)
+        for _ in range(20):
+            get(port)
+        # Let the worker not asked publish its counts.
+        time.sleep(1.5)
+        for _ in range(6):
+            url = f"http://127.0.0.1:{port}/stats"
+            stats = json.loads(urllib.request.urlopen(url, timeout=5).read())
+            assert stats["requests"] == 20
+            assert stats["top_clients"] == [{"client": "127.0.0.1", "requests": 20}]
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=10)
+        proc.stdout.close()
@@ -0,0 +1,73 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from hello_world import Handler, PooledHTTPServer
+from hello_world.probe import backend_of, probe, read_response, summarize
+
+
+@pytest.fixture
+def server():
+    handler = type("Handler", (Handler,), {"access_log": False})
+    server = PooledHTTPServer(("127.0.0.1", 0), handler, workers=4)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+@pytest.mark.parametrize("keep_alive", [True, False], ids=["keep-alive", "new-connection"])
+def test_probe_counts_every_request(server, keep_alive):
+    host, port = server.server_address
+    result = probe(f"http://{host}:{port}/", requests=200, concurrency=8, keep_alive=keep_alive)
+    assert result["errors"] == 0
+    assert result["requests"] == 200
+    assert list(result["backends"]) == [socket.gethostname()]
+    assert result["backends"][socket.gethostname()]["share"] == 1.0
+    assert result["skew"]["max_over_mean"] == 1.0
+
+
+def test_summarize_reports_skew_and_latency():
+    results = [("pod-a", 0.001)] * 60 + [("pod-b", 0.002)] * 30 + [("HTTP 503", 0.0005)] * 10
+    result = summarize(results, 2, 1.0)
+    assert list(result["backends"]) == ["pod-a", "pod-b", "HTTP 503"]
+    assert result["backends"]["pod-a"] == {
+        "requests": 60,
+        "share": 0.6,
+        "p50_ms": 1.0,
+        "p99_ms": 1.0,
+        "max_ms": 1.0,
+    }
+    assert result["skew"] == {"max_over_mean": 1.8, "min_over_mean": 0.3, "cv": 0.616}
+    assert result["errors"] == 2
+    assert result["rps"] == 100.0
+
+
+def test_backend_of():
+    assert backend_of(200, b"hello-world from pod-a\n") == "pod-a"
+    assert backend_of(503, b"overloaded, retry later\n") == "HTTP 503"
+    assert backend_of(200, b"something else") == "HTTP 200"
+
+
+def test_read_response_handles_chunked_bodies():
+    async def read(data):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await read_response(reader)
+
+    chunked = (
+        b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n3\r\nabc\r\n2\r\nde\r\n0\r\n\r\n"
+    )
+    assert asyncio.run(read(chunked)) == (200, b"abcde", False)
+    closed = b"HTTP/1.0 200 OK\r\n\r\nbody"
+    assert asyncio.run(read(closed)) == (200, b"body", True)
+
+
+def test_probe_rejects_non_http_urls():
+    with pytest.raises(ValueError):
+        probe("https://example.com/")
@@ -0,0 +1,115 @@
+import http.client
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from hello_world import Handler, PooledHTTPServer
+from hello_world.aio import AsyncioServer
+from hello_world.compact import CompactServer
+from hello_world.metrics import Metrics
+
+
+@pytest.fixture
+def pooled():
+    servers = []
+
+    def start(**kwargs):
+        handler = type("Handler", (Handler,), {"access_log": False, "metrics": Metrics()})
+        server = PooledHTTPServer(("127.0.0.1", 0), handler, **kwargs)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        servers.append((server, thread))
+        return server
+
+    yield start
+    for server, thread in servers:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+
+def probe(port, path):
+    with socket.create_connection(("127.0.0.1", port), timeout=2) as sock:
+        sock.sendall(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+        data = b""
+        while chunk := sock.recv(4096):
+            data += chunk
+    return data
+
+
+def test_probe_endpoints(pooled):
+    port = pooled(workers=2).server_address[1]
+    assert urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz").read() == b"ok\n"
+    assert urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz").read() == b"ready\n"
+
+
+def test_saturated_pool_answers_probes_and_reports_not_ready(pooled):
+    server = pooled(workers=1, queue_size=4, ready_max_inflight=2)
+    port = server.server_address[1]
+
+    # Requests whose headers never finish keep the only worker busy.
+    stalled = [socket.create_connection(("127.0.0.1", port)) for _ in range(2)]
+    try:
+        for sock in stalled:
+            sock.sendall(b"GET / HTTP/1.1\r\n")
+        deadline = time.monotonic() + 5
+        while server.inflight() < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        started = time.monotonic()
+        assert probe(port, "/healthz").startswith(b"HTTP/1.1 200 OK\r\n")
+        assert probe(port, "/readyz").startswith(b"HTTP/1.1 503 Service Unavailable\r\n")
+        assert time.monotonic() - started < 1
+    finally:
+        for sock in stalled:
+            sock.close()
+
+    deadline = time.monotonic() + 5
+    while server.inflight() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    try:
+        body = urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz").read()
+    except urllib.error.HTTPError as error:
+        body = error.read()
+    assert body == b"ready\n"
+
+
+def readyz(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        conn.request("GET", "/readyz")
+        return conn.getresponse().status
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("server_class", [AsyncioServer, CompactServer], ids=["asyncio", "compact"])
+def test_event_loop_engines_readiness_ignores_idle_connections(server_class):
+    server = server_class(("127.0.0.1", 0), metrics=Metrics(), ready_max_inflight=1)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    port = server.server_address[1]
+    idle = [http.client.HTTPConnection("127.0.0.1", port, timeout=5) for _ in range(3)]
+    try:
+        for conn in idle:
+            conn.request("GET", "/")
+            conn.getresponse().read()
+        assert readyz(port) == 200
+
+        with socket.create_connection(("127.0.0.1", port), timeout=5) as slow:
+            slow.sendall(b"GET /delay/500 HTTP/1.1\r\nHost: x\r\n\r\n")
+            deadline = time.monotonic() + 5
+            while not server.inflight() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert readyz(port) == 503
+            assert slow.recv(65536).startswith(b"HTTP/1.1 200 OK\r\n")
+    finally:
+        for conn in idle:
+            conn.close()
+        server.shutdown()
+        thread.join()
+        server.server_close()
@@ -0,0 +1,114 @@
+import http.client
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from hello_world import build_parser, make_server
+from hello_world.profiling import RequestTimer, Sampler
+
+ENGINES = [["--workers", "2"], ["--engine", "asyncio"], ["--engine", "compact"]]
+ENGINE_IDS = ["pool", "asyncio", "compact"]
+
+
+@pytest.fixture
+def serve_args(tmp_path):
+    servers = []
+
+    def start(*flags):
+        args = build_parser().parse_args(
+            ["--bind", "127.0.0.1", "--port", "0", "--access-log", str(tmp_path / "access.log")]
+            + list(flags)
+        )
+        server = make_server(args)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        servers.append((server, thread))
+        return server
+
+    yield start
+    for server, thread in servers:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+        server.access_log.close()
+
+
+def get(server, path="/"):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+    conn.request("GET", path)
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response
+
+
+@pytest.mark.parametrize("engine", ENGINES, ids=ENGINE_IDS)
+def test_server_timing_header(serve_args, engine):
+    server = serve_args("--server-timing", *engine)
+    for path in ("/", "/healthz", "/bytes/10"):
+        header = get(server, path).getheader("Server-Timing")
+        phases = [part.split(";")[0] for part in header.split(", ")]
+        assert phases[-2:] == ["parse", "handle"]
+    assert get(serve_args(*engine)).getheader("Server-Timing") is None
+
+
+@pytest.mark.parametrize("engine", ENGINES, ids=ENGINE_IDS)
+def test_slow_requests_are_traced(serve_args, tmp_path, engine):
+    server = serve_args("--trace-slow-ms", "20", *engine)
+    get(server, "/")
+    get(server, "/delay/50")
+    # The trace is logged once the response has been written, so it can
+    # trail the client reading it.
+    for _ in range(50):
+        server.access_log.flush()
+        traces = [line for line in open(tmp_path / "access.log") if "slow request" in line]
+        if traces:
+            break
+        time.sleep(0.02)
+    assert len(traces) == 1
+    assert '"GET /delay/50 HTTP/1.1"' in traces[0]
+    assert "parse=" in traces[0] and "handle=" in traces[0] and "write=" in traces[0]
+
+
+def test_request_timer_formats_phases():
+    timer = RequestTimer(time.perf_counter(), [("accept", 0.0015)])
+    timer.end("parse")
+    timer.finish()
+    assert [name for name, _ in timer.phases] == ["accept", "parse", "handle"]
+    assert timer.server_timing().startswith("accept;dur=1.500, parse;dur=")
+    assert str(timer).startswith("accept=1.500ms parse=")
+
+
+def test_sampler_writes_collapsed_stacks(tmp_path):
+    sampler = Sampler(tmp_path, seconds=0.2, interval=0.01)
+    sampler.start()
+    sampler.join()
+    (output,) = tmp_path.iterdir()
+    lines = output.read_text().splitlines()
+    assert lines
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(line.startswith("MainThread;") for line in lines)
+
+
+def test_sigusr1_dumps_profile(tmp_path):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "hello_world", "-b", "127.0.0.1", "-p", "0"]
+        + ["--access-log", "off", "--profile-dir", str(tmp_path), "--profile-seconds", "0.2"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        # Sent as soon as the server is announced, before it may be serving.
+        proc.stdout.readline()
+        os.kill(proc.pid, signal.SIGUSR1)
+        assert "stack samples" in proc.stderr.readline()
+        assert len(list(tmp_path.iterdir())) == 1
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
@@ -1,7 +1,9 @@
+import socket
 import threading
+import urllib.error
 import urllib.request
 
-from hello_world import Handler, HTTPServer
+from hello_world import Handler, HTTPServer, PooledHTTPServer
 
 
 def test_hello_world_response():
@@ -18,3 +20,73 @@ def test_hello_world_response():
 
     thread.join()
     server.server_close()
+
+
+def test_pooled_server_serves_past_idle_connection():
+    server = PooledHTTPServer(("127.0.0.1", 0), Handler, workers=2, queue_size=2)
+    port = server.server_address[1]
+
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    idle = socket.create_connection(("127.0.0.1", port))
+    try:
+        response = urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5)
+        assert response.read().decode().startswith("hello-world from ")
+    finally:
+        idle.close()
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+
+def test_unsupported_method_is_rejected():
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    port = server.server_address[1]
+
+    thread = threading.Thread(target=server.handle_request)
+    thread.start()
+
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/", data=b"x", method="POST")
+    try:
+        urllib.request.urlopen(request)
+    except urllib.error.HTTPError as error:
+        assert error.code == 501
+    else:
+        raise AssertionError("POST was accepted")
+
+    thread.join()
+    server.server_close()
+
+
+def recv_all(sock):
+    chunks = []
+    while chunk := sock.recv(65536):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def test_keep_alive_pipelining_until_max_requests():
+    handler = type("Handler", (Handler,), {"max_requests": 2})
+    server = PooledHTTPServer(("127.0.0.1", 0), handler, workers=1)
+    port = server.server_address[1]
+
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+            sock.sendall(b"GET / HTTP/1.1\r\nHost: x\r\n\r\n" * 2)
+            data = recv_all(sock)
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+    responses = data.split(b"HTTP/1.1 200 OK\r\n")[1:]
+    assert len(responses) == 2
+    assert b"Connection: close" not in responses[0]
+    assert b"Connection: close" in responses[1]
+    for response in responses:
+        head, body = response.split(b"\r\n\r\n")
+        assert f"Content-Length: {len(body)}".encode() in head
@@ -0,0 +1,145 @@
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from hello_world import Handler, PooledHTTPServer
+from hello_world.bench import Connection
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_serving(port, proc):
+    for _ in range(100):
+        if proc.poll() is not None:
+            raise AssertionError("server exited during startup")
+        try:
+            Connection(("127.0.0.1", port), keep_alive=False).get()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise AssertionError("server never answered")
+
+
+CONFIGS = [[], ["--workers", "4"], ["--engine", "asyncio"], ["--engine", "compact"]]
+CONFIG_IDS = ["serial", "pool", "asyncio", "compact"]
+
+
+@pytest.mark.parametrize("config", CONFIGS, ids=CONFIG_IDS)
+def test_sigterm_drains_without_failing_requests(config):
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "hello_world", "-b", "127.0.0.1", "-p", str(port)]
+        + ["--access-log", "off", "--max-requests", "0", "--shutdown-delay", "1"]
+        + config,
+        stdout=subprocess.DEVNULL,
+    )
+    address = ("127.0.0.1", port)
+    # Like a load balancer, clients stop sending once /readyz reports not ready.
+    not_ready = threading.Event()
+    results = {"ok": 0, "failed": []}
+    lock = threading.Lock()
+
+    def watch_readiness():
+        probe = Connection(address, keep_alive=False, request=b"GET /readyz HTTP/1.1\r\n\r\n")
+        while not not_ready.is_set():
+            if probe.get()[0] == 503:
+                not_ready.set()
+            time.sleep(0.02)
+
+    def client():
+        connection = Connection(address)
+        while not not_ready.is_set():
+            try:
+                status, body = connection.get()
+                assert status == 200 and body.startswith(b"hello-world from ")
+                with lock:
+                    results["ok"] += 1
+            except (OSError, AssertionError) as error:
+                with lock:
+                    results["failed"].append(repr(error))
+        connection.close()
+
+    try:
+        wait_until_serving(port, proc)
+        threads = [threading.Thread(target=client) for _ in range(4)]
+        threads.append(threading.Thread(target=watch_readiness))
+        for thread in threads:
+            thread.start()
+        time.sleep(0.5)
+        proc.send_signal(signal.SIGTERM)
+        for thread in threads:
+            thread.join(timeout=10)
+        assert proc.wait(timeout=10) == 0
+    finally:
+        not_ready.set()
+        proc.kill()
+        proc.wait()
+
+    assert not results["failed"]
+    assert results["ok"] > 0
+
+
+@pytest.mark.parametrize("config", CONFIGS, ids=CONFIG_IDS)
+def test_request_in_flight_when_accepting_stops_is_answered(config):
+    port = free_port()
+    # A keep-alive timeout far beyond the test's patience: exiting promptly
+    # means idle and answered connections were closed, not timed out.
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "hello_world", "-b", "127.0.0.1", "-p", str(port)]
+        + ["--access-log", "off", "--max-requests", "0", "--keepalive-timeout", "60"]
+        + config,
+        stdout=subprocess.DEVNULL,
+    )
+    address = ("127.0.0.1", port)
+    try:
+        wait_until_serving(port, proc)
+        idle = Connection(address)
+        assert idle.get()[0] == 200
+        with socket.create_connection(address, timeout=10) as sock:
+            sock.sendall(b"GET /delay/1000 HTTP/1.1\r\nHost: x\r\n\r\n")
+            time.sleep(0.3)
+            proc.send_signal(signal.SIGTERM)
+            signalled = time.monotonic()
+            data = b""
+            while chunk := sock.recv(65536):
+                data += chunk
+        assert proc.wait(timeout=10) == 0
+        assert time.monotonic() - signalled < 3
+    finally:
+        proc.kill()
+        proc.wait()
+    assert data.startswith(b"HTTP/1.1 200 ")
+    assert b"\r\nConnection: close\r\n" in data
+    assert data.endswith(b"hello-world from " + socket.gethostname().encode() + b"\n")
+
+
+def test_drain_timeout_holds_with_a_full_queue():
+    handler = type("Handler", (Handler,), {"access_log": False})
+    server = PooledHTTPServer(("127.0.0.1", 0), handler, workers=1, queue_size=1)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    slow = []
+    try:
+        for _ in range(2):
+            slow.append(socket.create_connection(server.server_address, timeout=5))
+            slow[-1].sendall(b"GET /delay/3000 HTTP/1.1\r\nHost: x\r\n\r\n")
+            time.sleep(0.1)
+        assert server.queued() == 1
+        server.shutdown()
+        thread.join()
+        started = time.monotonic()
+        assert not server.drain(0.5)
+        assert time.monotonic() - started < 1.5
+    finally:
+        for sock in slow:
+            sock.close()
+        server.server_close()
@@ -0,0 +1,34 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from hello_world.bench import startup
+
+baseline = json.loads(Path(__file__).with_name("bench_baseline.json").read_text())
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("config", sorted(baseline["configs"]))
+def test_first_response_within_budget(config):
+    result = startup(config, runs=3)
+    assert result["p50_ms"] <= baseline["first_response_budget_ms"], result
+
+
+def test_serving_does_not_import_the_subcommands():
+    code = (
+        "import sys, hello_world\n"
+        "sys.argv = ['hello-world', '--help']\n"
+        "try:\n"
+        "    hello_world.main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(sorted({'hello_world.bench', 'hello_world.probe', 'subprocess'}"
+        " & set(sys.modules)), file=sys.stderr)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stderr.strip() == "[]"
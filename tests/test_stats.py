@@ -0,0 +1,166 @@
+import http.client
+import json
+import threading
+import tracemalloc
+
+import pytest
+
+from hello_world import Handler, PooledHTTPServer
+from hello_world.aio import AsyncioServer
+from hello_world.compact import CompactServer
+from hello_world.stats import CountMinSketch, RateWindows, TopK, TrafficStats
+
+
+def test_sketch_never_undercounts_and_stays_within_bound():
+    sketch = CountMinSketch(width=1024, depth=4)
+    true_counts = {f"heavy-{i}": 500 * (i + 1) for i in range(5)}
+    for key, count in true_counts.items():
+        for _ in range(count):
+            sketch.add(key)
+    for i in range(20000):
+        sketch.add(f"client-{i}")
+    total = sum(true_counts.values()) + 20000
+    for key, count in true_counts.items():
+        assert count <= sketch.estimate(key) <= count + 2 * total / sketch.width
+
+
+def test_top_k_finds_heavy_hitters_among_many_clients():
+    stats = TrafficStats(top=3)
+    for i in range(5000):
+        stats.record(f"10.0.{i // 256}.{i % 256}")
+        if i % 10 == 0:
+            stats.record("192.0.2.1")
+        if i % 20 == 0:
+            stats.record("192.0.2.2")
+    top = [client for client, _ in stats.most_common()]
+    assert top[:2] == ["192.0.2.1", "192.0.2.2"]
+    assert len(stats.shard().top._heap) <= 4 * stats.top
+
+
+def test_top_k_replaces_smallest():
+    top = TopK(k=2)
+    top.offer("a", 5)
+    top.offer("b", 1)
+    top.offer("c", 3)
+    assert top.most_common() == [("a", 5), ("c", 3)]
+
+
+def test_forwarded_for_identifies_the_client():
+    stats = TrafficStats()
+    stats.record("10.0.0.1", "203.0.113.9, 10.0.0.7")
+    stats.record("10.0.0.1", "x" * 1000)
+    clients = {client for client, _ in stats.most_common()}
+    assert clients == {"203.0.113.9", "x" * 64}
+
+
+def test_threads_record_into_shards_that_snapshot_sums():
+    stats = TrafficStats()
+
+    def record():
+        for _ in range(1000):
+            stats.record("192.0.2.1")
+        stats.record("10.0.0.1", path="/healthz")
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    snapshot = stats.snapshot()
+    assert len(stats._shards) == 4
+    assert snapshot["requests"] == 4000
+    assert snapshot["top_clients"] == [{"client": "192.0.2.1", "requests": 4000}]
+
+
+def test_rate_windows():
+    rates = RateWindows()
+    for second in range(1000, 1060):
+        for _ in range(second % 3):
+            rates.add(second + 0.5)
+    assert rates.rate(10, 1059.5) == pytest.approx(sum(s % 3 for s in range(1050, 1060)) / 10)
+    assert rates.rate(60, 1059.5) == pytest.approx(1.0)
+    # Slots from more than one ring length ago are not counted again.
+    assert rates.rate(300, 1000.5 + 300) == pytest.approx(
+        sum(s % 3 for s in range(1001, 1060)) / 300
+    )
+
+
+def test_memory_does_not_grow_with_distinct_clients():
+    stats = TrafficStats()
+    tracemalloc.start()
+    try:
+        for i in range(20000):
+            stats.record(f"client-{i}")
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(20000, 120000):
+            stats.record(f"client-{i}")
+        growth = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert growth < 16 * 1024
+
+
+def pooled_server(stats):
+    handler = type("Handler", (Handler,), {"stats": stats, "access_log": False})
+    return PooledHTTPServer(("127.0.0.1", 0), handler, workers=2)
+
+
+@pytest.mark.parametrize(
+    "make_server",
+    [
+        pooled_server,
+        lambda stats: AsyncioServer(("127.0.0.1", 0), stats=stats),
+        lambda stats: CompactServer(("127.0.0.1", 0), stats=stats),
+    ],
+    ids=["stdlib", "asyncio", "compact"],
+)
+def test_stats_endpoint(make_server):
+    server = make_server(TrafficStats())
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+        for _ in range(3):
+            conn.request("GET", "/", headers={"X-Forwarded-For": "198.51.100.4"})
+            conn.getresponse().read()
+        conn.request("GET", "/healthz")
+        conn.getresponse().read()
+        conn.request("GET", "/stats")
+        response = conn.getresponse()
+        assert response.getheader("Content-Type") == "application/json"
+        stats = json.loads(response.read())
+        conn.close()
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+    assert stats["requests"] == 3
+    assert stats["top_clients"] == [{"client": "198.51.100.4", "requests": 3}]
+    assert stats["requests_per_second"]["10s"] == pytest.approx(0.3)
+
+
+def test_shared_slots_are_summed_and_survive_a_restart():
+    first, second, restarted = TrafficStats(), TrafficStats(), TrafficStats()
+    first.share(2)
+    second._shared = restarted._shared = first._shared
+    first.claim(0)
+    second.claim(1)
+    for _ in range(3):
+        first.record("192.0.2.1")
+        second.record("192.0.2.1")
+    second.record("192.0.2.2")
+    second.snapshot()
+
+    snapshot = first.snapshot()
+    assert snapshot["requests"] == 7
+    assert snapshot["top_clients"] == [
+        {"client": "192.0.2.1", "requests": 6},
+        {"client": "192.0.2.2", "requests": 1},
+    ]
+    assert snapshot["requests_per_second"]["10s"] == pytest.approx(0.7)
+
+    # A worker replacing the second one starts from its counts.
+    restarted.claim(1)
+    restarted.record("192.0.2.2")
+    restarted.snapshot()
+    assert first.snapshot()["top_clients"][1] == {"client": "192.0.2.2", "requests": 2}
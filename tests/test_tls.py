@@ -0,0 +1,179 @@
+import json
+import os
+import shutil
+import signal
+import socket
+import ssl
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from hello_world import build_parser, make_server, metrics, tls
+from hello_world.bench import bench
+
+pytestmark = pytest.mark.skipif(shutil.which("openssl") is None, reason="needs openssl")
+
+MODES = [[], ["--workers", "2"], ["--engine", "asyncio"], ["--engine", "compact"]]
+MODE_IDS = ["serial", "pool", "asyncio", "compact"]
+BASELINE = Path(__file__).with_name("bench_baseline.json")
+
+
+@pytest.fixture(scope="module")
+def certificate(tmp_path_factory):
+    return tls.self_signed(tmp_path_factory.mktemp("tls"), "127.0.0.1")
+
+
+@pytest.fixture(params=MODES, ids=MODE_IDS)
+def server(request, certificate):
+    certfile, keyfile = certificate
+    args = build_parser().parse_args(
+        request.param
+        + ["--bind", "127.0.0.1", "--port", "0", "--access-log", "off"]
+        + ["--tls-cert", certfile, "--tls-key", keyfile]
+    )
+    server = make_server(args)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def get(address, context, target="/", session=None):
+    """GET ``target`` over a new TLS connection; return (body, whether resumed, session)."""
+    with socket.create_connection(address[:2], timeout=5) as raw:
+        with context.wrap_socket(raw, server_hostname="127.0.0.1", session=session) as sock:
+            sock.sendall(f"GET {target} HTTP/1.1\r\nConnection: close\r\n\r\n".encode())
+            data = b""
+            while chunk := sock.recv(65536):
+                data += chunk
+            return data.partition(b"\r\n\r\n")[2], sock.session_reused, sock.session
+
+
+def handshakes():
+    lines = metrics.registry.render().splitlines()
+    return {
+        resumed: int(line.rsplit(" ", 1)[1])
+        for resumed in ("false", "true")
+        for line in lines
+        if line.startswith(f'hello_world_tls_handshakes_total{{resumed="{resumed}"}}')
+    }
+
+
+def test_sessions_are_resumed_and_counted(server, certificate):
+    context = tls.client_context(certificate[0])
+    before = handshakes()
+    body, resumed, session = get(server.server_address, context)
+    assert body.startswith(b"hello-world from ")
+    assert not resumed
+    for _ in range(2):
+        body, resumed, session = get(server.server_address, context, session=session)
+        assert body.startswith(b"hello-world from ")
+        assert resumed
+    after = handshakes()
+    assert after["false"] - before["false"] == 1
+    assert after["true"] - before["true"] == 2
+
+
+def test_payload_over_tls(server, certificate):
+    context = tls.client_context(certificate[0])
+    body, _, _ = get(server.server_address, context, "/bytes/300000")
+    assert len(body) == 300000
+
+
+def test_plaintext_client_does_not_break_the_server(server, certificate):
+    with socket.create_connection(server.server_address[:2], timeout=5) as sock:
+        sock.sendall(b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n")
+        try:
+            while sock.recv(65536):
+                pass
+        except ConnectionResetError:
+            pass
+    body, _, _ = get(server.server_address, tls.client_context(certificate[0]))
+    assert body.startswith(b"hello-world from ")
+
+
+def test_workers_share_session_ticket_keys(certificate):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        address = probe.getsockname()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "hello_world", "--processes", "2", "--access-log", "off"]
+        + ["--bind", address[0], "--port", str(address[1])]
+        + ["--tls-cert", certificate[0], "--tls-key", certificate[1]],
+        stdout=subprocess.DEVNULL,
+    )
+    context = tls.client_context(certificate[0])
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                _, _, session = get(address, context)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+        # Connections spread over both workers; each resumes a ticket issued
+        # by whichever worker served the first one.
+        assert all(get(address, context, session=session)[1] for _ in range(20))
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+
+
+def test_tls_key_requires_tls_cert():
+    result = subprocess.run(
+        [sys.executable, "-m", "hello_world", "--tls-key", "key.pem"],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 2
+    assert "--tls-key requires --tls-cert" in result.stderr
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("handshake", ["full", "resumed"])
+def test_handshake_throughput(handshake):
+    baseline = json.loads(BASELINE.read_text())
+    result = bench("", baseline["duration"], 4, keep_alive=False, tls=handshake)
+    assert result["errors"] == 0
+
+    if os.environ.get("HELLO_WORLD_BENCH_UPDATE"):
+        baseline["tls_handshakes"][handshake] = {"rps": result["rps"]}
+        BASELINE.write_text(json.dumps(baseline, indent=2) + "\n")
+        return
+
+    expected = baseline["tls_handshakes"][handshake]
+    assert result["rps"] >= expected["rps"] * (1 - baseline["rps_tolerance"]), result
+
+
+def test_pool_closes_shed_tls_connections_without_plaintext(certificate):
+    certfile, keyfile = certificate
+    args = build_parser().parse_args(
+        ["--bind", "127.0.0.1", "--port", "0", "--access-log", "off", "--workers", "1"]
+        + ["--max-inflight", "1", "--tls-cert", certfile, "--tls-key", keyfile]
+    )
+    server = make_server(args)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    context = tls.client_context(certfile)
+    try:
+        # A connection that never finishes its request keeps the only worker busy.
+        with socket.create_connection(server.server_address[:2], timeout=5) as raw:
+            with context.wrap_socket(raw, server_hostname="127.0.0.1") as busy:
+                busy.sendall(b"GET / HTTP/1.1\r\n")
+                deadline = time.monotonic() + 5
+                while server.inflight() < 1 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                with pytest.raises((ssl.SSLEOFError, ConnectionResetError)):
+                    get(server.server_address, context)
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
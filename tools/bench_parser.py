@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark request parsing: BaseHTTPRequestHandler.parse_request (via
+http.client and the email package) against the httpparse fast path, for a
+bare request and one with headers typical of a browser behind a proxy.
+"""
+
+import io
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from hello_world import Handler  # noqa: E402
+
+REQUESTS = {
+    "minimal": b"GET / HTTP/1.1\r\nHost: bench\r\n\r\n",
+    "browser": (
+        b"GET / HTTP/1.1\r\n"
+        b"Host: hello-world.example\r\n"
+        b"User-Agent: Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0\r\n"
+        b"Accept: text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8\r\n"
+        b"Accept-Language: en-US,en;q=0.5\r\n"
+        b"Accept-Encoding: gzip, deflate, br\r\n"
+        b"Referer: https://hello-world.example/\r\n"
+        b"X-Forwarded-For: 203.0.113.7\r\n"
+        b"X-Forwarded-Proto: https\r\n"
+        b"Connection: keep-alive\r\n\r\n"
+    ),
+}
+ITERATIONS = 20000
+
+
+def parse_all(handler, count):
+    """Parse ``count`` requests from handler.rfile the way handle_one_request does."""
+    for _ in range(count):
+        handler.raw_requestline = handler.rfile.readline(65537)
+        if not handler.parse_request():
+            raise RuntimeError("request rejected")
+
+
+def run(fast_parser, data):
+    handler = Handler.__new__(Handler)
+    handler.fast_parser = fast_parser
+    handler.rfile = io.BufferedReader(io.BytesIO(data * ITERATIONS))
+    start = time.perf_counter()
+    parse_all(handler, ITERATIONS)
+    elapsed = time.perf_counter() - start
+
+    # Allocation is traced in a second, shorter pass so it does not skew the timing.
+    handler.rfile = io.BufferedReader(io.BytesIO(data * 2))
+    tracemalloc.start()
+    try:
+        parse_all(handler, 1)
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        parse_all(handler, 1)
+        peak = tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return {"us_per_request": round(elapsed / ITERATIONS * 1e6, 2), "peak_alloc_bytes": peak}
+
+
+def main():
+    results = {
+        name: {"stdlib": run(False, data), "fast": run(True, data)}
+        for name, data in REQUESTS.items()
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
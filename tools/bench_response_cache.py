@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark the precomputed response cache against the per-request handler.
+Serves pipelined requests over a socketpair and reports, per request, the
+socket send calls, hostname lookups, peak transient allocation and time.
+"""
+
+import json
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from hello_world import Handler  # noqa: E402
+
+REQUEST = b"GET / HTTP/1.1\r\nHost: bench\r\n\r\n"
+REQUESTS = 20000
+
+
+class QuietHandler(Handler):
+    max_requests = 0
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LegacyHandler(QuietHandler):
+    """do_GET as it was before the response cache."""
+
+    def do_GET(self):
+        hostname = socket.gethostname()
+        body = f"hello-world from {hostname}\n".encode()
+        self.requests_served += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class CountingSocket:
+    def __init__(self, sock):
+        self.sock = sock
+        self.sends = 0
+
+    def sendall(self, data):
+        self.sends += 1
+        return self.sock.sendall(data)
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+
+def serve(handler_class, requests):
+    server_side, client_side = socket.socketpair()
+    counting = CountingSocket(server_side)
+
+    def send():
+        client_side.sendall(REQUEST * requests)
+        client_side.shutdown(socket.SHUT_WR)
+
+    def drain():
+        while client_side.recv(1 << 20):
+            pass
+
+    threads = [threading.Thread(target=send), threading.Thread(target=drain)]
+    for thread in threads:
+        thread.start()
+    try:
+        handler_class(counting, ("127.0.0.1", 0), None)
+    finally:
+        server_side.close()
+        for thread in threads:
+            thread.join()
+        client_side.close()
+    return counting
+
+
+def run(handler_class, requests):
+    lookups = 0
+    gethostname = socket.gethostname
+
+    def counting_gethostname():
+        nonlocal lookups
+        lookups += 1
+        return gethostname()
+
+    socket.gethostname = counting_gethostname
+    try:
+        start = time.perf_counter()
+        counting = serve(handler_class, requests)
+        elapsed = time.perf_counter() - start
+    finally:
+        socket.gethostname = gethostname
+
+    # Allocation is traced in a second, shorter pass so it does not skew the timing.
+    peaks = []
+    do_get = handler_class.do_GET
+
+    def traced_do_get(self):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        do_get(self)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+
+    handler_class.do_GET = traced_do_get
+    tracemalloc.start()
+    try:
+        serve(handler_class, 1000)
+    finally:
+        tracemalloc.stop()
+        handler_class.do_GET = do_get
+
+    return {
+        "sends_per_request": counting.sends / requests,
+        "hostname_lookups_per_request": lookups / requests,
+        "peak_alloc_bytes_per_request": sum(peaks) / len(peaks),
+        "us_per_request": elapsed / requests * 1e6,
+    }
+
+
+def main():
+    results = {
+        "legacy": run(LegacyHandler, REQUESTS),
+        "cached": run(QuietHandler, REQUESTS),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
-#!/usr/bin/env python3
 """
-Generate native draw.io diagram with AWS stencils.
-Uses mxGraph XML format with draw.io AWS shape library references.
+Build native draw.io diagrams with AWS stencils, in mxGraph XML format with
+draw.io AWS shape library references. Used by generate_diagrams.py.
 """
 
 import xml.etree.ElementTree as ET
@@ -88,8 +87,12 @@ def create_group(id, value, x, y, width, height, style=""):
 
     return cell
 
-def generate_eks_diagram():
-    """Generate EKS architecture diagram."""
+def eks_architecture(cluster, app):
+    """Return the EKS architecture as draw.io XML.
+
+    ``cluster`` and ``app`` are the eksctl and Kubernetes models built by
+    generate_diagrams.py; nodes and pods are laid out from their counts.
+    """
 
     # Create root structure
     mxfile = ET.Element("mxfile")
@@ -99,6 +102,16 @@ def generate_eks_diagram():
     diagram.set("name", "EKS Architecture")
     diagram.set("id", "eks-arch")
 
+    nodes = [
+        (group, index)
+        for group in cluster["node_groups"]
+        for index in range(1, group["desired"] + 1)
+    ]
+    pods = range(1, app["replicas"] + 1)
+    columns = max(len(nodes), len(pods), 2)
+    group_width = max(550, 160 * columns + 70)
+    width = max(1200, group_width + 650)
+
     model = ET.SubElement(diagram, "mxGraphModel")
     model.set("dx", "1434")
     model.set("dy", "780")
@@ -111,7 +124,7 @@ def generate_eks_diagram():
     model.set("fold", "1")
     model.set("page", "1")
     model.set("pageScale", "1")
-    model.set("pageWidth", "1600")
+    model.set("pageWidth", str(width + 400))
     model.set("pageHeight", "1200")
 
     root = ET.SubElement(model, "root")
@@ -121,20 +134,18 @@ def generate_eks_diagram():
     ET.SubElement(root, "mxCell", id="1", parent="0")
 
     # === AWS Cloud container ===
-    root.append(create_group("aws-cloud", "AWS Cloud (eu-west-1)", 50, 50, 1200, 900,
+    root.append(create_group("aws-cloud", f"AWS Cloud ({cluster['region']})", 50, 50, width, 900,
                              "fillColor=#F5F5F5;strokeColor=#232F3E;strokeWidth=2;"))
 
     # === VPC ===
-    root.append(create_cell("vpc", "VPC: 192.168.0.0/16", AWS_SHAPES["vpc"],
-                           70, 100, 900, 750, parent="aws-cloud"))
+    root.append(create_cell("vpc", f"VPC: {cluster['vpc_cidr']}", AWS_SHAPES["vpc"],
+                           70, 100, group_width + 350, 750, parent="aws-cloud"))
 
-    # === Public Subnets ===
-    root.append(create_cell("pub-subnet", "Public Subnets (eu-west-1a, 1b, 1c)",
+    # === Subnets ===
+    root.append(create_cell("pub-subnet", f"Public Subnets ({cluster['zones']})",
                            AWS_SHAPES["public_subnet"], 90, 140, 400, 200, parent="vpc"))
-
-    # === Private Subnets ===
-    root.append(create_cell("priv-subnet", "Private Subnets (eu-west-1a, 1b, 1c)",
-                           AWS_SHAPES["private_subnet"], 90, 380, 600, 400, parent="vpc"))
+    root.append(create_cell("priv-subnet", f"Private Subnets ({cluster['zones']})",
+                           AWS_SHAPES["private_subnet"], 90, 380, group_width + 50, 400, parent="vpc"))
 
     # === Gateways ===
     root.append(create_cell("igw", "Internet Gateway", AWS_SHAPES["igw"], 550, 160, 60, 60, parent="vpc"))
@@ -142,81 +153,85 @@ def generate_eks_diagram():
     root.append(create_cell("elb", "Load Balancer", AWS_SHAPES["elb"], 200, 200, 60, 60, parent="pub-subnet"))
 
     # === EKS Control Plane ===
-    root.append(create_cell("eks", "EKS Control Plane\nesade-teaching (K8s 1.32)",
-                           AWS_SHAPES["eks"], 750, 200, 78, 78, parent="aws-cloud"))
+    root.append(create_cell("eks", f"EKS Control Plane\n{cluster['name']} (K8s {cluster['version']})",
+                           AWS_SHAPES["eks"], group_width + 200, 200, 78, 78, parent="aws-cloud"))
 
-    # === Node Group ===
-    root.append(create_group("nodegroup", "Node Group: students (1-3 nodes)",
-                            110, 420, 550, 330, "fillColor=#E2E3E5;strokeColor=#6C757D;"))
+    # === Node Groups ===
+    groups = ", ".join(
+        f"{group['name']} ({group['min']}-{group['max']} nodes)" for group in cluster["node_groups"]
+    )
+    root.append(create_group("nodegroup", f"Node Group: {groups}",
+                            110, 420, group_width, 330, "fillColor=#E2E3E5;strokeColor=#6C757D;"))
 
     # === EC2 Nodes ===
-    root.append(create_cell("node1", "Node 1\nt3.medium", AWS_SHAPES["ec2"],
-                           140, 480, 60, 60, parent="nodegroup"))
-    root.append(create_cell("node2", "Node 2\nt3.medium", AWS_SHAPES["ec2"],
-                           300, 480, 60, 60, parent="nodegroup"))
+    node_ids = []
+    for column, (group, index) in enumerate(nodes):
+        node_id = f"node{column + 1}"
+        node_ids.append(node_id)
+        root.append(create_cell(node_id, f"Node {column + 1}\n{group['instance_type']}", AWS_SHAPES["ec2"],
+                               140 + 160 * column, 480, 60, 60, parent="nodegroup"))
 
     # === K8s Pods ===
-    root.append(create_cell("pod1", "Pod 1", K8S_SHAPES["pod"], 150, 580, 48, 48, parent="nodegroup"))
-    root.append(create_cell("pod2", "Pod 2", K8S_SHAPES["pod"], 310, 580, 48, 48, parent="nodegroup"))
-    root.append(create_cell("svc", "Service (LB)", K8S_SHAPES["service"], 230, 680, 48, 48, parent="nodegroup"))
+    for pod in pods:
+        root.append(create_cell(f"pod{pod}", f"Pod {pod}", K8S_SHAPES["pod"],
+                               150 + 160 * (pod - 1), 580, 48, 48, parent="nodegroup"))
+    root.append(create_cell("svc", f"Service ({app['service_type']})", K8S_SHAPES["service"],
+                           70 + 80 * columns, 680, 48, 48, parent="nodegroup"))
 
     # === CloudFormation ===
-    root.append(create_cell("cfn1", "eksctl-cluster", AWS_SHAPES["cloudformation"],
-                           1000, 300, 60, 60, parent="aws-cloud"))
+    root.append(create_cell("cfn1", f"eksctl-{cluster['name']}-cluster", AWS_SHAPES["cloudformation"],
+                           group_width + 450, 300, 60, 60, parent="aws-cloud"))
     root.append(create_cell("cfn2", "eksctl-nodegroup", AWS_SHAPES["cloudformation"],
-                           1000, 450, 60, 60, parent="aws-cloud"))
+                           group_width + 450, 450, 60, 60, parent="aws-cloud"))
 
     # === External actors ===
     root.append(create_cell("users", "Users", AWS_SHAPES["users"], 50, 980, 60, 60))
-    root.append(create_cell("developer", "Developer", GENERIC_SHAPES["developer"], 1300, 200, 40, 80))
-    root.append(create_cell("github", "GitHub Actions", GENERIC_SHAPES["github"], 1300, 400, 60, 60))
-    root.append(create_cell("ecr", "ghcr.io", AWS_SHAPES["ecr"], 1300, 550, 60, 60))
+    root.append(create_cell("developer", "Developer", GENERIC_SHAPES["developer"], width + 100, 200, 40, 80))
+    root.append(create_cell("github", "GitHub Actions", GENERIC_SHAPES["github"], width + 100, 400, 60, 60))
+    root.append(create_cell("ecr", app["registry"], AWS_SHAPES["ecr"], width + 100, 550, 60, 60))
 
     # === Edges ===
-    # HTTP traffic (green)
-    root.append(create_edge("e1", "HTTP", "users", "igw", "strokeColor=#22863a;strokeWidth=2;"))
-    root.append(create_edge("e2", "", "igw", "elb", "strokeColor=#22863a;strokeWidth=2;"))
-    root.append(create_edge("e3", "traffic", "elb", "svc", "strokeColor=#22863a;strokeWidth=2;"))
-    root.append(create_edge("e4", "", "svc", "pod1", "strokeColor=#22863a;"))
-    root.append(create_edge("e5", "", "svc", "pod2", "strokeColor=#22863a;"))
-
+    edges = [
+        # HTTP traffic (green)
+        ("HTTP", "users", "igw", "strokeColor=#22863a;strokeWidth=2;"),
+        ("", "igw", "elb", "strokeColor=#22863a;strokeWidth=2;"),
+        ("traffic", "elb", "svc", "strokeColor=#22863a;strokeWidth=2;"),
+    ]
+    edges += [("", "svc", f"pod{pod}", "strokeColor=#22863a;") for pod in pods]
     # Control plane (blue dashed)
-    root.append(create_edge("e6", "kubectl", "developer", "eks", "strokeColor=#0366d6;dashed=1;"))
-    root.append(create_edge("e7", "kubelet", "eks", "node1", "strokeColor=#0366d6;dashed=1;"))
-    root.append(create_edge("e8", "", "eks", "node2", "strokeColor=#0366d6;dashed=1;"))
-
+    edges.append(("kubectl", "developer", "eks", "strokeColor=#0366d6;dashed=1;"))
+    edges += [
+        ("kubelet" if i == 0 else "", "eks", node, "strokeColor=#0366d6;dashed=1;")
+        for i, node in enumerate(node_ids)
+    ]
     # CI/CD (purple)
-    root.append(create_edge("e9", "push", "github", "ecr", "strokeColor=#6f42c1;"))
-    root.append(create_edge("e10", "deploy", "github", "eks", "strokeColor=#6f42c1;dashed=1;"))
-
+    edges.append(("push", "github", "ecr", "strokeColor=#6f42c1;"))
+    edges.append(("deploy", "github", "eks", "strokeColor=#6f42c1;dashed=1;"))
     # Image pull (orange)
-    root.append(create_edge("e11", "pull", "ecr", "node1", "strokeColor=#e36209;dashed=1;"))
-    root.append(create_edge("e12", "", "ecr", "node2", "strokeColor=#e36209;dashed=1;"))
-
+    edges += [
+        ("pull" if i == 0 else "", "ecr", node, "strokeColor=#e36209;dashed=1;")
+        for i, node in enumerate(node_ids)
+    ]
     # NAT outbound (amber)
-    root.append(create_edge("e13", "outbound", "node1", "nat", "strokeColor=#b08800;dashed=1;"))
-    root.append(create_edge("e14", "", "node2", "nat", "strokeColor=#b08800;dashed=1;"))
-    root.append(create_edge("e15", "", "nat", "igw", "strokeColor=#b08800;dashed=1;"))
-
+    edges += [
+        ("outbound" if i == 0 else "", node, "nat", "strokeColor=#b08800;dashed=1;")
+        for i, node in enumerate(node_ids)
+    ]
+    edges.append(("", "nat", "igw", "strokeColor=#b08800;dashed=1;"))
     # CloudFormation creates (gray dotted)
-    root.append(create_edge("e16", "creates", "cfn1", "eks", "strokeColor=#586069;dashed=1;dashPattern=1 2;"))
-    root.append(create_edge("e17", "", "cfn1", "vpc", "strokeColor=#586069;dashed=1;dashPattern=1 2;"))
-    root.append(create_edge("e18", "creates", "cfn2", "node1", "strokeColor=#586069;dashed=1;dashPattern=1 2;"))
-    root.append(create_edge("e19", "", "cfn2", "node2", "strokeColor=#586069;dashed=1;dashPattern=1 2;"))
-
-    # Format and save
+    edges.append(("creates", "cfn1", "eks", "strokeColor=#586069;dashed=1;dashPattern=1 2;"))
+    edges.append(("", "cfn1", "vpc", "strokeColor=#586069;dashed=1;dashPattern=1 2;"))
+    edges += [
+        ("creates" if i == 0 else "", "cfn2", node, "strokeColor=#586069;dashed=1;dashPattern=1 2;")
+        for i, node in enumerate(node_ids)
+    ]
+    for number, (label, source, target, style) in enumerate(edges, 1):
+        root.append(create_edge(f"e{number}", label, source, target, style))
+
+    # Format
     xml_str = ET.tostring(mxfile, encoding="unicode")
     pretty_xml = minidom.parseString(xml_str).toprettyxml(indent="  ")
 
     # Remove extra blank lines
     lines = [line for line in pretty_xml.split('\n') if line.strip()]
-    pretty_xml = '\n'.join(lines)
-
-    return pretty_xml
-
-if __name__ == "__main__":
-    xml = generate_eks_diagram()
-    output_path = "../infra/docs/eks-architecture.drawio"
-    with open(output_path, "w") as f:
-        f.write(xml)
-    print(f"Generated: {output_path}")
+    return '\n'.join(lines) + '\n'
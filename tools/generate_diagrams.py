@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+# /// script
+# dependencies = ["diagrams", "pyyaml"]
+# ///
+"""
+Generate the architecture diagrams from the files they describe: k8s/*.yaml,
+infra/eksctl-cluster.yaml and .github/workflows/release.yml.
+
+Each target's model is read from those files and hashed together with the
+generator sources. Targets whose hash is unchanged and whose outputs exist
+are skipped; the rest render in parallel in a process pool. PNG output needs
+Graphviz (`dot`) on the PATH.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import drawio
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+CACHE = Path(__file__).with_name(".diagram-cache.json")
+GENERATORS = [Path(__file__), Path(drawio.__file__)]
+RULE = "─────────────"
+WIDE_RULE = "─────────────────────────────────────────"
+
+
+def load(path):
+    """Return the non-empty YAML documents in ``path``."""
+    with open(path) as f:
+        return [doc for doc in yaml.safe_load_all(f) if doc]
+
+
+def k8s_model():
+    """The deployment, its image and how the service reaches it, from k8s/*.yaml."""
+    manifests = {}
+    for path in sorted((ROOT / "k8s").glob("*.yaml")):
+        for doc in load(path):
+            manifests.setdefault(doc["kind"], doc)
+    deployment, service = manifests["Deployment"], manifests["Service"]
+    kustomization = manifests.get("Kustomization", {})
+    container = deployment["spec"]["template"]["spec"]["containers"][0]
+    image, _, tag = container["image"].partition(":")
+    for override in kustomization.get("images", []):
+        if override["name"] == image:
+            image = override.get("newName", image)
+            tag = override.get("newTag", tag)
+    ports = {port.get("name"): port["containerPort"] for port in container.get("ports", [])}
+    service_port = service["spec"]["ports"][0]
+    target_port = service_port.get("targetPort", service_port["port"])
+    return {
+        "namespace": kustomization.get("namespace")
+        or deployment["metadata"].get("namespace", "default"),
+        "deployment": deployment["metadata"]["name"],
+        "replicas": deployment["spec"].get("replicas", 1),
+        "image": image,
+        "tag": tag or "latest",
+        "registry": image.partition("/")[0],
+        "repository": image.partition("/")[2],
+        "container_port": ports.get(target_port, target_port),
+        "service": service["metadata"]["name"],
+        "service_type": service["spec"].get("type", "ClusterIP"),
+        "service_port": service_port["port"],
+    }
+
+
+def eks_model():
+    """The cluster, its node groups and network, from infra/eksctl-cluster.yaml."""
+    config = load(ROOT / "infra" / "eksctl-cluster.yaml")[0]
+    metadata = config["metadata"]
+    region = metadata["region"]
+    groups = []
+    for group in config.get("managedNodeGroups", []) + config.get("nodeGroups", []):
+        minimum = group.get("minSize", 1)
+        groups.append(
+            {
+                "name": group["name"],
+                "instance_type": group.get("instanceType", "m5.large"),
+                "min": minimum,
+                "max": group.get("maxSize", minimum),
+                "desired": group.get("desiredCapacity", minimum),
+            }
+        )
+    # eksctl's defaults when the config leaves them out.
+    zones = config.get("availabilityZones") or [f"{region}{zone}" for zone in "abc"]
+    return {
+        "name": metadata["name"],
+        "region": region,
+        "version": str(metadata.get("version", "")),
+        "node_groups": groups,
+        "addons": [addon["name"] for addon in config.get("addons", [])],
+        "vpc_cidr": config.get("vpc", {}).get("cidr", "192.168.0.0/16"),
+        "zones": ", ".join(zones),
+    }
+
+
+def step_summary(step):
+    """A short label for a workflow step, or None for checkout, toolchain setup and installs."""
+    uses = step.get("uses", "")
+    run = step.get("run", "").strip()
+    if uses.startswith("actions/checkout") or "/setup-" in uses or run.startswith("uv sync"):
+        return None
+    if "name" in step:
+        return step["name"]
+    if run:
+        return run.splitlines()[0].removeprefix("uv run ")
+    return uses.partition("@")[0]
+
+
+def workflow_model():
+    """Triggers, jobs and stages of .github/workflows/release.yml."""
+    workflow = load(ROOT / ".github" / "workflows" / "release.yml")[0]
+    # YAML 1.1 reads the bare key `on` as true.
+    on = workflow.get("on", workflow.get(True))
+    if isinstance(on, str):
+        on = {on: None}
+    elif isinstance(on, list):
+        on = dict.fromkeys(on)
+    jobs = {}
+    for name, job in workflow["jobs"].items():
+        needs = job.get("needs", [])
+        steps = job.get("steps", [])
+        jobs[name] = {
+            "needs": [needs] if isinstance(needs, str) else needs,
+            "if": job.get("if"),
+            "steps": [summary for summary in map(step_summary, steps) if summary],
+            "pushes_image": any(
+                step.get("uses", "").startswith("docker/build-push-action") for step in steps
+            ),
+            "deploys": any("kubectl" in step.get("run", "") for step in steps),
+        }
+
+    def depth(name):
+        return 1 + max((depth(need) for need in jobs[name]["needs"]), default=-1)
+
+    stages = {}
+    for name in jobs:
+        stages.setdefault(depth(name), []).append(name)
+    return {
+        "name": workflow.get("name", "workflow"),
+        "triggers": list(on),
+        "tags": (on.get("push") or {}).get("tags", []),
+        "env": workflow.get("env", {}),
+        "jobs": jobs,
+        "stages": [stages[level] for level in sorted(stages)],
+    }
+
+
+def render_k8s(filename, app):
+    from diagrams import Cluster, Diagram, Edge
+    from diagrams.k8s.compute import Pod
+    from diagrams.k8s.network import Service
+    from diagrams.onprem.client import Users
+    from diagrams.onprem.container import Docker
+
+    graph_attr = {"fontsize": "14", "bgcolor": "white", "pad": "0.5", "splines": "ortho"}
+    port = app["container_port"]
+    with Diagram(
+        "Hello World - Kubernetes Architecture",
+        filename=filename,
+        show=False,
+        direction="LR",
+        outformat=["png", "dot"],
+        graph_attr=graph_attr,
+    ):
+        users = Users(f"Users\n(HTTP :{app['service_port']})")
+        registry = Docker(f"{app['registry']}\n{app['repository']}")
+
+        with Cluster("Kubernetes Cluster"):
+            with Cluster(f"Namespace: {app['namespace']}"):
+                svc = Service(f"Service\n{app['service']}\n({app['service_type']})")
+                with Cluster(f"Deployment: {app['deployment']}\n(replicas: {app['replicas']})"):
+                    with Cluster("ReplicaSet"):
+                        pods = [Pod(f"Pod {i}\n:{port}") for i in range(1, app["replicas"] + 1)]
+
+        # Traffic flow (green)
+        users >> Edge(color="green", style="bold", label="HTTP") >> svc
+        for i, pod in enumerate(pods):
+            label = f":{app['service_port']}→:{port}" if i == 0 else ""
+            svc >> Edge(color="green", label=label) >> pod
+
+        # Image pull (orange dashed)
+        for i, pod in enumerate(pods):
+            label = "pull image" if i == 0 else ""
+            registry >> Edge(color="orange", style="dashed", label=label) >> pod
+
+
+def render_eks(filename, cluster, app):
+    from diagrams import Cluster, Diagram, Edge
+    from diagrams.aws.compute import EKS
+    from diagrams.aws.general import Users
+    from diagrams.aws.management import Cloudformation
+    from diagrams.aws.network import ELB, InternetGateway, NATGateway
+    from diagrams.k8s.compute import Pod
+    from diagrams.k8s.infra import Node
+    from diagrams.k8s.network import Service
+    from diagrams.onprem.ci import GithubActions
+    from diagrams.onprem.client import User
+    from diagrams.onprem.container import Docker
+
+    graph_attr = {
+        "fontsize": "14",
+        "bgcolor": "white",
+        "pad": "1.0",
+        "splines": "ortho",
+        "nodesep": "1.0",
+        "ranksep": "1.2",
+    }
+    name = cluster["name"]
+    with Diagram(
+        f"EKS Architecture: {name}",
+        filename=filename,
+        show=False,
+        direction="TB",
+        outformat=["png", "dot"],
+        graph_attr=graph_attr,
+    ):
+        # External actors
+        users = Users(f"Users/Clients\n{RULE}\nExternal HTTP requests")
+        developer = User(f"Developer\n{RULE}\nkubectl/eksctl\ncluster management")
+        github = GithubActions(f"GitHub Actions\n{RULE}\nCI/CD pipeline\nautomates build & deploy")
+        registry = Docker(f"{app['registry']}\n{RULE}\nContainer Registry\nstores Docker images")
+
+        with Cluster(f"AWS Cloud ({cluster['region']})"):
+            with Cluster(
+                f"CloudFormation Stacks\n{WIDE_RULE}\nfile: eksctl-cluster.yaml\n"
+                "automates deployment of managed K8s cluster",
+                graph_attr={"rankdir": "TB"},
+            ):
+                cfn_cluster = Cloudformation(
+                    f"eksctl-{name}-cluster\n{RULE}\nVPC, Control Plane\nIAM Roles, OIDC"
+                )
+                cfn_groups = [
+                    Cloudformation(
+                        f"eksctl-{name}-nodegroup-{group['name']}\n{RULE}\n"
+                        "EC2, Auto Scaling Group\nLaunch Template"
+                    )
+                    for group in cluster["node_groups"]
+                ]
+                # Force vertical layout
+                for stack in cfn_groups:
+                    cfn_cluster - Edge(style="invis") - stack
+
+            eks_control = EKS(
+                f"EKS Control Plane\n{RULE}\n{name} (K8s {cluster['version']})\n"
+                "AWS-managed API server"
+            )
+
+            with Cluster(
+                f"VPC: {cluster['vpc_cidr']}\n{WIDE_RULE}\n"
+                "Isolated network for all cluster resources"
+            ):
+                igw = InternetGateway(f"Internet Gateway\n{RULE}\nEnables internet\naccess for VPC")
+                nat = NATGateway(f"NAT Gateway\n{RULE}\nOutbound internet\nfor private subnets")
+
+                with Cluster(
+                    f"Public Subnets ({cluster['zones']})\n{WIDE_RULE}\n"
+                    "Internet-facing resources, Load Balancers"
+                ):
+                    elb = ELB(f"AWS ELB\n{RULE}\nLoadBalancer\nroutes HTTP traffic")
+
+                with Cluster(
+                    f"Private Subnets ({cluster['zones']})\n{WIDE_RULE}\n"
+                    "Isolated workloads, no direct internet access"
+                ):
+                    nodes = []
+                    for group, stack in zip(cluster["node_groups"], cfn_groups):
+                        with Cluster(
+                            f"Node Group: {group['name']}\n{WIDE_RULE}\n"
+                            f"Auto Scaling {group['min']}-{group['max']} nodes, managed by AWS"
+                        ):
+                            for _ in range(group["desired"]):
+                                with Cluster(f"Node {len(nodes) + 1} - {group['instance_type']}"):
+                                    node = Node(f"kubelet\n{RULE}\nNode agent\nruns pods")
+                                    if cluster["addons"]:
+                                        with Cluster("EKS Add-ons\n(AWS-managed)"):
+                                            Pod("\n".join(cluster["addons"]))
+                                nodes.append((node, stack))
+
+                    with Cluster(
+                        f"Namespace: {app['namespace']}\n{WIDE_RULE}\n"
+                        "Application isolation boundary"
+                    ):
+                        svc = Service(
+                            f"Service\n{RULE}\n{app['service_type']}\n"
+                            f"exposes app on :{app['service_port']}"
+                        )
+                        pods = [
+                            Pod(
+                                f"Pod {i}\n{RULE}\n{app['deployment']}\n"
+                                f"container :{app['container_port']}"
+                            )
+                            for i in range(1, app["replicas"] + 1)
+                        ]
+
+        # Connections - HTTP Traffic (green)
+        users >> Edge(color="green", style="bold", label="HTTP") >> igw
+        igw >> Edge(color="green", style="bold") >> elb
+        elb >> Edge(color="green", style="bold", label="traffic") >> svc
+        for pod in pods:
+            svc >> Edge(color="green") >> pod
+
+        # Connections - Control Plane (blue dashed)
+        developer >> Edge(color="blue", style="dashed", label="kubectl") >> eks_control
+        for i, (node, _) in enumerate(nodes):
+            label = "kubelet" if i == 0 else ""
+            eks_control >> Edge(color="blue", style="dashed", label=label) >> node
+
+        # Connections - CI/CD (purple)
+        github >> Edge(color="purple", label="push image") >> registry
+        github >> Edge(color="purple", style="dashed", label="deploy") >> eks_control
+
+        # Connections - Image Pull (orange) and NAT outbound (amber)
+        for i, (node, _) in enumerate(nodes):
+            pull, outbound = ("pull image", "outbound") if i == 0 else ("", "")
+            registry >> Edge(color="orange", style="dashed", label=pull) >> node
+            node >> Edge(color="goldenrod", style="dashed", label=outbound) >> nat
+        nat >> Edge(color="goldenrod", style="dashed") >> igw
+
+        # Connections - Pod placement (gray dotted), spread over the nodes
+        for i, pod in enumerate(pods):
+            if nodes:
+                node = nodes[i % len(nodes)][0]
+                pod >> Edge(color="gray", style="dotted", label="runs on") >> node
+
+        # Connections - CloudFormation creates (gray dotted)
+        cfn_cluster >> Edge(color="darkgray", style="dotted", label="creates") >> eks_control
+        cfn_cluster >> Edge(color="darkgray", style="dotted") >> igw
+        cfn_cluster >> Edge(color="darkgray", style="dotted") >> nat
+        for node, stack in nodes:
+            stack >> Edge(color="darkgray", style="dotted", label="creates") >> node
+
+
+def render_cicd(filename, workflow, app):
+    from diagrams import Cluster, Diagram, Edge
+    from diagrams.aws.compute import EKS
+    from diagrams.aws.general import Users
+    from diagrams.k8s.compute import Pod
+    from diagrams.k8s.network import Service
+    from diagrams.onprem.ci import GithubActions
+    from diagrams.onprem.container import Docker
+    from diagrams.onprem.vcs import Github
+
+    graph_attr = {
+        "fontsize": "14",
+        "bgcolor": "white",
+        "pad": "1.0",
+        "splines": "ortho",
+        "nodesep": "0.8",
+        "ranksep": "1.0",
+    }
+    env = workflow["env"]
+    jobs = workflow["jobs"]
+    triggers = [f"git push tag {tag}" for tag in workflow["tags"]]
+    triggers += [trigger for trigger in workflow["triggers"] if trigger != "push" or not triggers]
+    with Diagram(
+        "GitHub Actions CI/CD Pipeline",
+        filename=filename,
+        show=False,
+        direction="LR",
+        outformat=["png", "dot"],
+        graph_attr=graph_attr,
+    ):
+        dev = Users(f"Developer\n{RULE}\n" + "\nor ".join(triggers))
+
+        with Cluster("GitHub"):
+            repo = Github(f"Repository\n{RULE}\n{app['repository']}\nsource code")
+
+        actions = {}
+        with Cluster(
+            f"GitHub Actions\n{WIDE_RULE}\nCI/CD Pipeline (release.yml: {workflow['name']})"
+        ):
+            for number, stage in enumerate(workflow["stages"], 1):
+                after = sorted({need for name in stage for need in jobs[name]["needs"]})
+                notes = ["parallel"] if len(stage) > 1 else []
+                if after:
+                    notes.append(f"after {', '.join(after)}")
+                with Cluster(f"Stage {number}: {', '.join(stage)}\n({', '.join(notes)})"):
+                    for name in stage:
+                        job = jobs[name]
+                        label = f"{name.title()}\n{RULE}\n" + "\n".join(job["steps"][:3])
+                        if job["if"]:
+                            label += f"\nif: {job['if']}"
+                        actions[name] = GithubActions(label)
+
+        with Cluster("Container Registry"):
+            registry = Docker(f"{app['registry']}\n{RULE}\n{app['repository']}\n:{app['tag']}")
+
+        eks_name = env.get("EKS_CLUSTER", "EKS")
+        region = env.get("AWS_REGION")
+        with Cluster(
+            f"AWS EKS\n{WIDE_RULE}\n{eks_name} cluster" + (f" ({region})" if region else "")
+        ):
+            eks = EKS(f"EKS\n{RULE}\nKubernetes API")
+            with Cluster(f"Namespace: {app['namespace']}"):
+                svc = Service(f"Service\n{RULE}\n{app['service_type']}")
+                pods = [Pod(f"Pod {i}") for i in range(1, app["replicas"] + 1)]
+
+        users = Users(f"End Users\n{RULE}\nHTTP requests")
+
+        # Flow - Trigger (blue)
+        dev >> Edge(color="blue", label="push tag" if workflow["tags"] else "trigger") >> repo
+
+        # Flow - CI stages (purple) and the jobs they gate (purple dashed)
+        first = True
+        for name, job in jobs.items():
+            if not job["needs"]:
+                repo >> Edge(color="purple", label="trigger" if first else "") >> actions[name]
+                first = False
+            for need in job["needs"]:
+                label = "triggers" if job["deploys"] else "pass"
+                color = "green" if job["deploys"] else "purple"
+                actions[need] >> Edge(color=color, style="dashed", label=label) >> actions[name]
+
+        # Flow - Image push (orange) and deploy (green)
+        for name, job in jobs.items():
+            if job["pushes_image"]:
+                actions[name] >> Edge(color="orange", label="push image") >> registry
+            if job["deploys"]:
+                actions[name] >> Edge(color="green", label="kubectl") >> eks
+
+        # Flow - Image pull (orange dashed) and K8s internal (gray)
+        eks >> Edge(color="gray", style="dotted") >> svc
+        for i, pod in enumerate(pods):
+            registry >> Edge(color="orange", style="dashed", label="pull" if i == 0 else "") >> pod
+            svc >> Edge(color="gray", style="dotted") >> pod
+
+        # Flow - User traffic (green bold)
+        users >> Edge(color="green", style="bold", label="HTTP") >> svc
+
+
+def render_drawio(filename, cluster, app):
+    Path(f"{filename}.drawio").write_text(drawio.eks_architecture(cluster, app))
+
+
+# name: (renderer, models it is drawn from, output path without suffix, suffixes)
+TARGETS = {
+    "k8s-architecture": (render_k8s, ["app"], "k8s/docs/k8s-architecture", [".png", ".dot"]),
+    "eks-architecture": (
+        render_eks,
+        ["cluster", "app"],
+        "infra/docs/eks-architecture",
+        [".png", ".dot"],
+    ),
+    "eks-architecture-drawio": (
+        render_drawio,
+        ["cluster", "app"],
+        "infra/docs/eks-architecture",
+        [".drawio"],
+    ),
+    "cicd-architecture": (
+        render_cicd,
+        ["workflow", "app"],
+        ".github/workflows/docs/cicd-architecture",
+        [".png", ".dot"],
+    ),
+}
+
+MODELS = {"app": k8s_model, "cluster": eks_model, "workflow": workflow_model}
+
+
+def outputs(name):
+    _, _, base, suffixes = TARGETS[name]
+    return [ROOT / f"{base}{suffix}" for suffix in suffixes]
+
+
+def fingerprint(name, models, generators):
+    """Hash everything a target's output depends on."""
+    _, uses, _, _ = TARGETS[name]
+    digest = hashlib.sha256(generators)
+    digest.update(name.encode())
+    digest.update(json.dumps({use: models[use] for use in uses}, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def render(name, models):
+    """Render one target; runs in a worker process. Returns the seconds it took."""
+    started = time.perf_counter()
+    renderer, uses, base, _ = TARGETS[name]
+    renderer(str(ROOT / base), *(models[use] for use in uses))
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument(
+        "targets", nargs="*", help=f"Targets to build (default: all of {list(TARGETS)})"
+    )
+    parser.add_argument("--force", action="store_true", help="Render even if nothing changed")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="List the targets that would render and exit"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count(), help="Worker processes (default: CPUs)"
+    )
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.targets) - set(TARGETS))
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(unknown)}")
+    names = args.targets or list(TARGETS)
+
+    started = time.perf_counter()
+    models = {name: build() for name, build in MODELS.items()}
+    generators = b"".join(path.read_bytes() for path in GENERATORS)
+    cache = json.loads(CACHE.read_text()) if CACHE.exists() else {}
+    hashes = {name: fingerprint(name, models, generators) for name in names}
+    stale = [
+        name
+        for name in names
+        if args.force
+        or cache.get(name) != hashes[name]
+        or not all(path.exists() for path in outputs(name))
+    ]
+    for name in names:
+        if name not in stale:
+            print(f"up to date: {name}")
+    if args.dry_run:
+        for name in stale:
+            print(f"would render: {name}")
+        return 0
+
+    failed = 0
+    if stale:
+        with ProcessPoolExecutor(max_workers=max(1, min(args.jobs, len(stale)))) as pool:
+            futures = {name: pool.submit(render, name, models) for name in stale}
+            for name, future in futures.items():
+                try:
+                    seconds = future.result()
+                except Exception as exc:
+                    failed += 1
+                    print(f"failed: {name}: {exc}", file=sys.stderr)
+                    continue
+                cache[name] = hashes[name]
+                paths = ", ".join(str(path.relative_to(ROOT)) for path in outputs(name))
+                print(f"rendered: {name} ({paths}) in {seconds:.1f}s")
+        CACHE.write_text(json.dumps(cache, indent=2, sort_keys=True) + "\n")
+    print(
+        f"{len(stale) - failed} rendered, {len(names) - len(stale)} up to date, "
+        f"{failed} failed in {time.perf_counter() - started:.1f}s"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())